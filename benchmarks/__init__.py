@@ -0,0 +1,5 @@
+"""Benchmarks for the pckbuilder package.
+
+These are not part of the distributed package, run them from the repository root, for
+example with `python -m benchmarks.memory`.
+"""
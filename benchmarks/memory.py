@@ -0,0 +1,40 @@
+"""Measure the memory used by the component graph of a large synthetic package.
+
+Usage: python -m benchmarks.memory [module_count] [classes_per_module]
+"""
+import gc
+import sys
+import tracemalloc
+from .synthetic import synthetic_package
+
+
+def measure(intern_types: bool, module_count: int, classes_per_module: int) -> int:
+    """Returns the amount of bytes allocated for the component graph."""
+    gc.collect()
+    tracemalloc.start()
+    package = synthetic_package(
+        module_count, classes_per_module, intern_types=intern_types
+    )
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del package
+
+    return size
+
+
+def main():
+    """Script entrypoint."""
+    module_count = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    classes_per_module = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+
+    separate = measure(False, module_count, classes_per_module)
+    interned = measure(True, module_count, classes_per_module)
+
+    print(f"modules: {module_count}, classes per module: {classes_per_module}")
+    print(f"separate TypeComponents: {separate / 1024 / 1024:.1f} MiB")
+    print(f"interned TypeComponents: {interned / 1024 / 1024:.1f} MiB")
+    print(f"reduction: {100 * (separate - interned) / separate:.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""Time and memory profile the rendering, formatting and building of synthetic packages.
+
+Usage: python -m benchmarks.run [--modules 10] [--classes 50] [--output results.json]
+
+Results are written as JSON so runs can be compared over time, pass the results of an
+earlier run with --compare to print the relative difference.
+"""
+import argparse
+import json
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+from pckbuilder import PackageComponent, RenderCache, Text, build
+from pckbuilder.utils import format_text
+from .synthetic import synthetic_package
+
+
+def measure(
+    name: str, function: Callable[[], object], repeats: int
+) -> Dict[str, object]:
+    """Run the given function and return its timings and peak memory usage.
+
+    The peak memory is measured in a separate run, as tracing allocations slows down the
+    function considerably.
+    """
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    function()
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "name": name,
+        "repeats": repeats,
+        "seconds_min": min(timings),
+        "seconds_mean": statistics.mean(timings),
+        "peak_memory_bytes": peak_memory,
+    }
+
+
+def text_add(line_count: int) -> Callable[[], str]:
+    """Returns a function composing a Text of the given amount of lines."""
+
+    def compose() -> str:
+        text = Text()
+        for index in range(line_count):
+            text.add(f"line_{index} = {index}", indent=4)
+
+        return text.string
+
+    return compose
+
+
+def rerender_changed_method(package: PackageComponent) -> Callable[[], None]:
+    """Returns a function rendering the package with a RenderCache after a method changed.
+
+    The cache is filled first, so every run measures a render pass in which only the
+    changed method and its class have to be rendered again.
+    """
+    method = package.modules[0].classes[0].methods[0]
+    cache = RenderCache()
+    with cache:
+        for module in package.modules:
+            module.text()
+
+    def rerender():
+        method.body = f"return {time.perf_counter_ns()}"
+        with cache:
+            for module in package.modules:
+                module.text()
+
+    return rerender
+
+
+def benchmarks(package: PackageComponent, folder: Path) -> Dict[str, Callable]:
+    """Returns all benchmarks to run for the given package.
+
+    Components render from scratch unless a RenderCache is used, so the text benchmarks
+    measure rendering on every repeat.
+    """
+    module = package.modules[0]
+    class_ = module.classes[0]
+    method = class_.methods[0]
+    variable = class_.class_arguments[0]
+    module_text = module.text()
+
+    def build_package(**options) -> Callable[[], None]:
+        def run():
+            build(package, Path(folder, "build"), **options)
+
+        return run
+
+    return {
+        "text_add": text_add(10_000),
+        "type_text": lambda: [variable.type.text() for _ in range(10_000)],
+        "variable_text": lambda: [variable.text() for _ in range(10_000)],
+        "method_text": lambda: [method.text() for _ in range(1_000)],
+        "class_text": lambda: [class_.text() for _ in range(100)],
+        "module_text": module.text,
+        "package_text": lambda: [module.text() for module in package.modules],
+        "package_rerender_cached": rerender_changed_method(package),
+        "black_format_module": lambda: format_text(module_text),
+        "build_unformatted": build_package(format_with_black=False),
+        "build": build_package(),
+    }
+
+
+def compare(results: dict, previous: dict):
+    """Print the relative difference between the results and the previous results."""
+    previous_results = {result["name"]: result for result in previous["results"]}
+    for result in results["results"]:
+        before = previous_results.get(result["name"])
+        if not before:
+            continue
+
+        timing = result["seconds_min"] / before["seconds_min"] - 1
+        memory = result["peak_memory_bytes"] / max(before["peak_memory_bytes"], 1) - 1
+        print(f"{result['name']:<24} time {timing:+7.1%}  memory {memory:+7.1%}")
+
+
+def main(arguments: Optional[List[str]] = None):
+    """Script entrypoint."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--modules", type=int, default=10)
+    parser.add_argument("--classes", type=int, default=50)
+    parser.add_argument("--methods", type=int, default=5)
+    parser.add_argument("--arguments", type=int, default=3)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--only", action="append", help="Only run the named benchmark")
+    parser.add_argument("--output", type=Path, help="Write the results to this file")
+    parser.add_argument("--compare", type=Path, help="Results of an earlier run")
+    options = parser.parse_args(arguments)
+
+    parameters = {
+        "module_count": options.modules,
+        "classes_per_module": options.classes,
+        "methods_per_class": options.methods,
+        "argument_count": options.arguments,
+    }
+    package = synthetic_package(**parameters)
+
+    folder = Path(tempfile.mkdtemp(prefix="pckbuilder-benchmark-"))
+    try:
+        results = []
+        for name, function in benchmarks(package, folder).items():
+            if options.only and name not in options.only:
+                continue
+
+            result = measure(name, function, options.repeats)
+            print(
+                f"{name:<24} {result['seconds_min']:10.4f}s "
+                f"{result['peak_memory_bytes'] / 1024 / 1024:10.1f} MiB",
+                file=sys.stderr,
+            )
+            results.append(result)
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": parameters,
+        "results": results,
+    }
+
+    if options.output:
+        with open(options.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if options.compare:
+        with open(options.compare) as f:
+            compare(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Generate synthetic packages resembling the ones created from large schemas."""
+from typing import Callable
+from pckbuilder import (
+    ClassComponent,
+    FunctionComponent,
+    MethodComponent,
+    ModuleComponent,
+    PackageComponent,
+    TypeComponent,
+    VariableComponent,
+)
+
+FIELD_TYPES = [("str", False), ("int", False), ("str", True), ("List", True)]
+
+
+def synthetic_package(
+    module_count: int = 10,
+    classes_per_module: int = 50,
+    methods_per_class: int = 5,
+    argument_count: int = 3,
+    intern_types: bool = True,
+) -> PackageComponent:
+    """Generate a synthetic package.
+
+    :param module_count: The amount of modules in the package
+    :param classes_per_module: The amount of classes in every module
+    :param methods_per_class: The amount of methods in every class
+    :param argument_count: The amount of class arguments and method arguments
+    :param intern_types: Share a single TypeComponent between all identical types
+    """
+    make_type: Callable[..., TypeComponent] = (
+        TypeComponent.intern if intern_types else TypeComponent
+    )
+
+    def variables(prefix: str):
+        return [
+            VariableComponent(
+                f"{prefix}_{index}",
+                f"The {prefix} number {index}",
+                make_type(*FIELD_TYPES[index % len(FIELD_TYPES)]),
+            )
+            for index in range(argument_count)
+        ]
+
+    modules = []
+    for module_index in range(module_count):
+        classes = []
+        for class_index in range(classes_per_module):
+            methods = [
+                MethodComponent(
+                    f"method_{method_index}",
+                    f"Method number {method_index}.",
+                    f"return argument_0",
+                    arguments=variables("argument"),
+                    return_type=make_type("str"),
+                )
+                for method_index in range(methods_per_class)
+            ]
+            classes.append(
+                ClassComponent(
+                    f"Model{module_index}x{class_index}",
+                    f"Synthetic model number {class_index}.",
+                    class_arguments=variables("field"),
+                    methods=methods,
+                )
+            )
+
+        modules.append(
+            ModuleComponent(
+                f"module_{module_index}",
+                f"Synthetic module number {module_index}.",
+                imports=["from typing import List, Optional"],
+                classes=classes,
+                functions=[
+                    FunctionComponent(
+                        "helper",
+                        "A module level helper.",
+                        "return None",
+                        arguments=variables("argument"),
+                    )
+                ],
+            )
+        )
+
+    return PackageComponent(
+        "synthetic",
+        "A synthetic package",
+        "0.1.0",
+        modules=modules,
+        imports=["from .module_0 import Model0x0"],
+    )
@@ -10,6 +10,7 @@ from pckbuilder import (
     TypeComponent,
     ClassComponent,
     build,
+    print_event,
 )
 
 
@@ -87,7 +88,7 @@ def main():
         keywords=["test", "mathijs"],
         imports=["from .test import MyClass"],
     )
-    build(package)
+    build(package, events=print_event)
 
 
 if __name__ == "__main__":
@@ -6,5 +6,13 @@ from .components.type import TypeComponent
 from .components.function import FunctionComponent
 from .components.method import MethodComponent
 from .components.class_ import ClassComponent
-from .build import build
+from .components.base import RenderCache
+from .build import build, verify_black_compatible, ModuleBuildError
 from .utils import Text
+from .cache import FormatCache
+from .imports import ClassIndex, resolve_imports
+from .deduplicate import deduplicate
+from .validate import ModuleValidationError, SyntaxProblem, validate_modules
+from .snapshot import Snapshot, load_snapshot, save_snapshot
+from .spec import BuildSpec, load_spec, parse_spec
+from .events import BuildEvent, BuildReport, print_event
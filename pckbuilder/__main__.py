@@ -0,0 +1,5 @@
+"""Run the pckbuilder command line with python -m pckbuilder."""
+import sys
+from .cli import main
+
+sys.exit(main())
@@ -0,0 +1,175 @@
+import base64
+import hashlib
+import io
+import os
+import re
+import tarfile
+import time
+import zipfile
+from abc import ABC, abstractmethod
+from pathlib import Path
+from .components.package import PackageComponent
+from .writer import FileWriter
+
+
+def distribution_name(name: str) -> str:
+    """Returns the name of a package as used in the filenames of its archives."""
+    return re.sub(r"[-_.]+", "_", name)
+
+
+class ArchiveWriter(FileWriter, ABC):
+    """Writes the files of a build into a single archive in the build folder.
+
+    The archive is written to a temporary file which replaces the archive once the build
+    completes, so a failed build never leaves a partial archive behind.
+    """
+
+    extension = ""
+
+    def __init__(
+        self, package: PackageComponent, build_folder: Path, max_pending: int = 16
+    ):
+        """Open the archive and start the thread of the writer.
+
+        :param package: The package the archive is built from
+        :param build_folder: The existing folder the archive is written to
+        :param max_pending: The maximum amount of files waiting to be written
+        """
+        self.package = package
+        self.location = Path(build_folder, self.filename)
+        self.mtime = time.time()
+        self._temporary_location = self.location.with_name(
+            f".{self.location.name}.{os.getpid()}.tmp"
+        )
+        self._open()
+        super().__init__(build_folder, max_pending)
+
+    @property
+    def base_name(self) -> str:
+        """Returns the name of the archive without extension."""
+        return f"{distribution_name(self.package.name)}-{self.package.version}"
+
+    @property
+    def filename(self) -> str:
+        """Returns the filename of the archive."""
+        return f"{self.base_name}{self.extension}"
+
+    def create_folders(self, folders):
+        """Archives don't need folders to be created up front."""
+        return []
+
+    def _write_file(self, relative_path: str, content: str):
+        """Add a single file to the archive, this runs on the thread of the writer."""
+        self._add(relative_path, content.encode("utf-8"))
+
+    def _finish(self):
+        """Close the archive and move it into place."""
+        self._close()
+        os.replace(self._temporary_location, self.location)
+
+    def _abort(self):
+        """Close and remove the partially written archive."""
+        try:
+            self._close(complete=False)
+        finally:
+            self._temporary_location.unlink(missing_ok=True)
+
+    @abstractmethod
+    def _open(self):
+        """Open the temporary archive for writing."""
+
+    @abstractmethod
+    def _add(self, name: str, data: bytes):
+        """Add a file to the archive."""
+
+    @abstractmethod
+    def _close(self, complete: bool = True):
+        """Close the archive, writing any remaining entries when the build is complete."""
+
+
+class WheelWriter(ArchiveWriter):
+    """Writes the package modules into a pure python wheel.
+
+    The METADATA file is generated from the same fields as the setup.cfg file and the
+    RECORD file lists the hash and size of every file in the wheel.
+    """
+
+    extension = "-py3-none-any.whl"
+    project_files = False
+
+    @property
+    def dist_info(self) -> str:
+        """Returns the name of the .dist-info folder in the wheel."""
+        return f"{self.base_name}.dist-info"
+
+    def _open(self):
+        """Open the temporary wheel for writing."""
+        self._archive = zipfile.ZipFile(
+            self._temporary_location, "w", zipfile.ZIP_DEFLATED
+        )
+        self._record = []
+
+    def _add(self, name: str, data: bytes):
+        """Add a file to the wheel and the RECORD."""
+        info = zipfile.ZipInfo(name, time.localtime(self.mtime)[:6])
+        info.compress_type = zipfile.ZIP_DEFLATED
+        info.external_attr = 0o644 << 16
+        self._archive.writestr(info, data)
+
+        digest = base64.urlsafe_b64encode(hashlib.sha256(data).digest()).rstrip(b"=")
+        self._record.append(f"{name},sha256={digest.decode()},{len(data)}")
+
+    def _close(self, complete: bool = True):
+        """Write the .dist-info files and close the wheel."""
+        if self._archive.fp is None:
+            return
+
+        if complete:
+            wheel = "\n".join(
+                [
+                    "Wheel-Version: 1.0",
+                    "Generator: pckbuilder",
+                    "Root-Is-Purelib: true",
+                    "Tag: py3-none-any",
+                ]
+            )
+            self._add(
+                f"{self.dist_info}/METADATA", self.package.metadata_text().encode()
+            )
+            self._add(f"{self.dist_info}/WHEEL", f"{wheel}\n".encode())
+            self._add(
+                f"{self.dist_info}/top_level.txt", f"{self.package.name}\n".encode()
+            )
+
+            record = "\n".join(self._record + [f"{self.dist_info}/RECORD,,"])
+            self._archive.writestr(f"{self.dist_info}/RECORD", f"{record}\n")
+
+        self._archive.close()
+
+
+class SdistWriter(ArchiveWriter):
+    """Writes the package and its project files into a gzipped tar source distribution."""
+
+    extension = ".tar.gz"
+
+    def _open(self):
+        """Open the temporary sdist for writing."""
+        self._archive = tarfile.open(self._temporary_location, "w:gz")
+
+    def _add(self, name: str, data: bytes):
+        """Add a file to the sdist, inside the folder named after the package."""
+        info = tarfile.TarInfo(f"{self.base_name}/{name}")
+        info.size = len(data)
+        info.mtime = int(self.mtime)
+        info.mode = 0o644
+        self._archive.addfile(info, io.BytesIO(data))
+
+    def _close(self, complete: bool = True):
+        """Write the PKG-INFO file and close the sdist."""
+        if self._archive.closed:
+            return
+
+        if complete:
+            self._add("PKG-INFO", self.package.metadata_text().encode())
+
+        self._archive.close()
@@ -1,7 +1,445 @@
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    as_completed,
+    wait,
+)
+from contextlib import contextmanager
+from functools import partial
 from pathlib import Path
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 from .components.package import PackageComponent
+from .components.module import ModuleComponent
+import cProfile
+import difflib
+import os
+import random
 import shutil
-from .utils import write_file
+import time
+from .cache import FormatCache
+from .events import (
+    ARCHIVE_CREATED,
+    BYTECODE_COMPILED,
+    BUILD_FINISHED,
+    BUILD_STARTED,
+    FILE_REMOVED,
+    FILE_UNCHANGED,
+    FILE_WRITTEN,
+    FOLDER_CREATED,
+    FOLDER_REMOVED,
+    BuildEvent,
+    EventSink,
+)
+from .deduplicate import deduplicate
+from .imports import resolve_imports
+from .manifest import Manifest
+from .utils import format_text, hash_text, text_hasher
+from .archive import SdistWriter, WheelWriter
+from .bytecode import cache_locations, compile_files
+from .validate import ModuleValidationError, validate_modules
+from .writer import FileWriter
+import black
+
+
+class ModuleBuildError(Exception):
+    """Raised when rendering or formatting a module fails."""
+
+    def __init__(self, module_name: str, message: str):
+        """Initialise the error.
+
+        :param module_name: The name of the module that failed to build
+        :param message: The description of the underlying error
+        """
+        super().__init__(module_name, message)
+        self.module_name = module_name
+        self.message = message
+
+    def __str__(self) -> str:
+        """Pretty representation of the error."""
+        return f"Failed to build module '{self.module_name}': {self.message}"
+
+
+def _formatter_name(format_with_black: bool) -> str:
+    """Returns the name of the formatter, this is part of the input hash of a file."""
+    return f"black {black.__version__}" if format_with_black else "unformatted"
+
+
+def input_hash(content: str, format_with_black: bool) -> str:
+    """Returns the hash identifying the unformatted content of a file.
+
+    The black version is part of the hash as a different version may format differently.
+    """
+    return hash_text(_formatter_name(format_with_black), content)
+
+
+class RenderedModule(NamedTuple):
+    """The result of rendering a module.
+
+    The content is None when the module didn't change since the previous build, or when it
+    was streamed straight to its file. In the latter case the output hash, write time, size
+    and line count are set.
+    """
+
+    input_hash: str
+    content: Optional[str] = None
+    output_hash: Optional[str] = None
+    render_seconds: float = 0.0
+    format_seconds: float = 0.0
+    write_seconds: float = 0.0
+    size: int = 0
+    line_count: int = 0
+
+
+def _stream_module(
+    module: ModuleComponent,
+    location: Path,
+    previous_hash: Optional[str] = None,
+    black_compatible: bool = False,
+) -> RenderedModule:
+    """Stream the unformatted text of a module to its file while it renders.
+
+    The text is written to a temporary file next to the location, which only replaces
+    the location when the input hash differs from the previous hash.
+    """
+    input_digest = text_hasher(_formatter_name(False))
+    output_digest = text_hasher()
+    temporary_location = location.with_name(f".{location.name}.{os.getpid()}.tmp")
+    start = time.perf_counter()
+    write_seconds = 0.0
+    size = 0
+    line_count = 0
+
+    try:
+        with open(temporary_location, "w") as f:
+            for chunk in module.iter_text(black_compatible):
+                write_start = time.perf_counter()
+                f.write(chunk)
+                write_seconds += time.perf_counter() - write_start
+
+                encoded_chunk = chunk.encode("utf-8")
+                input_digest.update(encoded_chunk)
+                output_digest.update(encoded_chunk)
+                size += len(encoded_chunk)
+                line_count += chunk.count("\n")
+
+        render_seconds = time.perf_counter() - start - write_seconds
+        content_hash = input_digest.hexdigest()
+        if content_hash == previous_hash:
+            temporary_location.unlink()
+            return RenderedModule(content_hash, render_seconds=render_seconds)
+
+        os.replace(temporary_location, location)
+    except BaseException:
+        temporary_location.unlink(missing_ok=True)
+        raise
+
+    return RenderedModule(
+        content_hash,
+        output_hash=output_digest.hexdigest(),
+        render_seconds=render_seconds,
+        write_seconds=write_seconds,
+        size=size,
+        line_count=line_count,
+    )
+
+
+def render_module(
+    module: ModuleComponent,
+    format_with_black: bool = True,
+    previous_hash: Optional[str] = None,
+    format_cache: Optional[FormatCache] = None,
+    location: Optional[Path] = None,
+    black_compatible: bool = False,
+) -> RenderedModule:
+    """Render the text of a module and optionally format it with black.
+
+    Formatting is skipped when the input hash equals the previous hash. Without formatting
+    and with a location, the module is streamed straight to that file instead of being
+    returned.
+
+    :param module: The ModuleComponent to render
+    :param format_with_black: format the text with black formatter
+    :param previous_hash: The input hash of the module at the previous build
+    :param format_cache: Optional cache of black formatted results
+    :param location: The full path of the file to stream the module to
+    :param black_compatible: Render the module the way black would format it
+    """
+    try:
+        if location is not None and not format_with_black:
+            return _stream_module(module, location, previous_hash, black_compatible)
+
+        start = time.perf_counter()
+        content = module.text(black_compatible)
+        render_seconds = time.perf_counter() - start
+
+        content_hash = input_hash(content, format_with_black)
+        if content_hash == previous_hash:
+            return RenderedModule(content_hash, render_seconds=render_seconds)
+
+        start = time.perf_counter()
+        if format_with_black:
+            content = format_text(content, format_cache)
+        format_seconds = time.perf_counter() - start
+    except Exception as error:
+        raise ModuleBuildError(
+            module.name, f"{error.__class__.__name__}: {error}"
+        ) from error
+
+    return RenderedModule(
+        content_hash,
+        content,
+        render_seconds=render_seconds,
+        format_seconds=format_seconds,
+    )
+
+
+def _module_weight(module: ModuleComponent) -> int:
+    """Estimate the rendering cost of a module from the amount of components in it.
+
+    Classes given as raw strings count as a single component.
+    """
+    weight = len(module.variables) + len(module.functions)
+    for class_ in module.classes:
+        weight += 1
+        if not isinstance(class_, str):
+            weight += len(class_.class_arguments) + len(class_.methods)
+
+    return weight
+
+
+def _materialise_bodies(
+    modules: Iterable[Tuple[ModuleComponent, str]],
+) -> Iterator[Tuple[ModuleComponent, str]]:
+    """Collect the bodies given as generators into lists, as the modules are yielded.
+
+    A generator can only be rendered once and can't be sent to a worker process, so its
+    lines are kept for the rest of the build when modules are checked before they are
+    rendered or are rendered by several processes.
+    """
+    for module, relative_path in modules:
+        functions = [
+            function
+            for class_ in module.classes
+            if not isinstance(class_, str)
+            for function in class_.methods
+        ] + list(module.functions)
+        for function in functions:
+            if not isinstance(function, str) and isinstance(function.body, Iterator):
+                function.body = list(function.body)
+
+        yield module, relative_path
+
+
+def _walk_packages(
+    package: PackageComponent, folder: str
+) -> Iterator[Tuple[PackageComponent, str]]:
+    """Yields the package and all its subpackages, depth first.
+
+    :param package: The package to start walking from
+    :param folder: The folder of the package, relative to the build folder
+    """
+    yield package, folder
+    for subpackage in package.subpackages:
+        yield from _walk_packages(subpackage, f"{folder}/{subpackage.name}")
+
+
+def _iter_module_files(
+    packages: List[Tuple[PackageComponent, str]],
+    max_module_classes: Optional[int] = None,
+    exports: Optional[Dict[str, List[str]]] = None,
+) -> Iterator[Tuple[ModuleComponent, str]]:
+    """Yields the modules of the packages with the path of their file.
+
+    The modules of every package are consumed once, so they can be generators.
+
+    :param packages: The packages with their folder relative to the build folder
+    :param max_module_classes: Shard modules with more classes than this
+    :param exports: Collects the re-export statements of the modules of packages with
+    export_modules set, by the folder of their package, as the modules are yielded
+    """
+    for package, folder in packages:
+        for module in package.modules:
+            if exports is not None and package.export_modules:
+                statement = package.export_statement(module)
+                if statement:
+                    exports.setdefault(folder, []).append(statement)
+
+            if max_module_classes:
+                shards = module.shard(max_classes=max_module_classes)
+            else:
+                shards = [module]
+
+            for shard in shards:
+                yield shard, f"{folder}/{shard.name}.py"
+
+
+def _render_modules(
+    modules: Iterable[Tuple[ModuleComponent, str]],
+    build_folder: Optional[Path],
+    jobs: Optional[int] = 1,
+    previous_hash: Optional[Callable[[str], Optional[str]]] = None,
+    format_with_black: bool = True,
+    format_cache: Optional[FormatCache] = None,
+    black_compatible: bool = False,
+) -> Iterator[Tuple[ModuleComponent, str, RenderedModule]]:
+    """Render and format modules, yielding them with their path and the rendered result.
+
+    With more than one job the modules are spread over a process pool. Only a few modules
+    per worker are submitted ahead, so a stream of modules is consumed as the workers
+    finish them. For a list, the biggest modules are submitted first so a single large
+    module doesn't end up running last. Modules are yielded in the order they complete.
+
+    :param modules: The modules to render, with the path of their file relative to the
+    build folder. Any iterable is consumed once, as the modules are rendered
+    :param build_folder: The folder unformatted modules are streamed to. None returns
+    their content instead
+    :param jobs: The amount of worker processes to use. None uses all available CPUs
+    :param previous_hash: Returns the input hash of the file on disk for a relative path.
+    Modules that still have this hash are yielded without content
+    :param format_with_black: format the modules with black formatter
+    :param format_cache: Optional cache of black formatted results
+    :param black_compatible: Render the modules the way black would format them
+    """
+
+    def arguments(module: ModuleComponent, relative_path: str) -> tuple:
+        """Returns the arguments to render the given module with."""
+        return (
+            module,
+            format_with_black,
+            previous_hash(relative_path) if previous_hash else None,
+            format_cache,
+            Path(build_folder, relative_path) if build_folder is not None else None,
+            black_compatible,
+        )
+
+    if isinstance(modules, list):
+        if len(modules) <= 1:
+            jobs = 1
+        modules = sorted(
+            modules, key=lambda item: _module_weight(item[0]), reverse=True
+        )
+
+    if jobs == 1:
+        for module, relative_path in modules:
+            yield module, relative_path, render_module(
+                *arguments(module, relative_path)
+            )
+        return
+
+    max_pending = 4 * (jobs or os.cpu_count() or 1)
+    futures: Dict[Future, Tuple[ModuleComponent, str]] = {}
+
+    def result(future: Future) -> Tuple[ModuleComponent, str, RenderedModule]:
+        """Returns the module of a finished future with its path and rendered result.
+
+        Failures in the worker are raised as a ModuleBuildError by render_module already,
+        others, like a module that can't be pickled, are raised as one here.
+        """
+        module, relative_path = futures.pop(future)
+        try:
+            return module, relative_path, future.result()
+        except ModuleBuildError:
+            raise
+        except Exception as error:
+            raise ModuleBuildError(
+                module.name, f"{error.__class__.__name__}: {error}"
+            ) from error
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        try:
+            for module, relative_path in modules:
+                while len(futures) >= max_pending:
+                    done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield result(future)
+
+                try:
+                    future = executor.submit(
+                        render_module, *arguments(module, relative_path)
+                    )
+                except Exception as error:
+                    raise ModuleBuildError(
+                        module.name, f"{error.__class__.__name__}: {error}"
+                    ) from error
+
+                futures[future] = (module, relative_path)
+
+            for future in as_completed(list(futures)):
+                yield result(future)
+        finally:
+            for future in futures:
+                future.cancel()
+
+
+def verify_black_compatible(
+    modules: List[ModuleComponent], sample_size: int = 10, seed: Optional[int] = None
+):
+    """Check that black leaves the black compatible text of a sample of modules unchanged.
+
+    Run this on a sample of the modules before building with black_compatible set and
+    format_with_black disabled. A ModuleBuildError showing the changes black would make
+    is raised for the first module that black would change.
+
+    :param modules: The modules to take the sample from
+    :param sample_size: The amount of modules to check
+    :param seed: Seed for picking the sample, to make the check reproducible
+    """
+    sample = modules
+    if len(modules) > sample_size:
+        sample = random.Random(seed).sample(modules, sample_size)
+
+    for module in sample:
+        content = module.text(black_compatible=True)
+        try:
+            formatted = format_text(content)
+        except Exception as error:
+            raise ModuleBuildError(
+                module.name, f"{error.__class__.__name__}: {error}"
+            ) from error
+
+        if formatted != content:
+            difference = "".join(
+                difflib.unified_diff(
+                    content.splitlines(True),
+                    formatted.splitlines(True),
+                    f"{module.name}.py",
+                    f"{module.name}.py (black)",
+                )
+            )
+            raise ModuleBuildError(
+                module.name, f"black would reformat the module:\n{difference}"
+            )
+
+
+@contextmanager
+def _profiled(location: Optional[Path] = None):
+    """Run the body of the with statement under cProfile when a location is given.
+
+    :param location: The file to write the profile statistics to
+    """
+    if location is None:
+        yield
+        return
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(location)
 
 
 def build(
@@ -10,49 +448,331 @@ def build(
     create_pyproject_file=True,
     create_setup_file=True,
     create_readme_file=True,
+    jobs: Optional[int] = 1,
+    incremental: bool = False,
+    format_cache: Optional[FormatCache] = None,
+    format_with_black: bool = True,
+    events: Optional[EventSink] = None,
+    profile: Optional[Path] = None,
+    black_compatible: bool = False,
+    verify_sample: int = 0,
+    write_queue_size: int = 16,
+    target: str = "folder",
+    compute_imports: bool = False,
+    max_module_classes: Optional[int] = None,
+    compile_bytecode: bool = False,
+    optimization_levels: Sequence[int] = (0,),
+    deduplicate_definitions: bool = False,
+    validate: bool = False,
 ):
     """Build given PackageComponent.
 
     :param package: The PackageComponent to build
     :param build_folder: The folder where the package will be written to. NOTE:
-    any existing items in this folder will be removed before building
+    any existing items in this folder will be removed before building, unless
+    incremental is set
+    :param jobs: The amount of worker processes used to render and format the modules.
+    None uses all available CPUs, 1 renders everything in the current process
+    :param incremental: Only write files whose content changed since the previous build,
+    as recorded in the manifest of the build folder. Files that are no longer part of
+    the package are removed, any other existing items are left alone
+    :param format_cache: Cache of black formatted results which is shared between builds.
+    The least recently used entries are evicted at the end of the build
+    :param format_with_black: format the python files with black formatter. Without
+    formatting, modules are streamed straight to their files while they render
+    :param events: Callable receiving a BuildEvent for every step of the build, like
+    print_event or a BuildReport. The build doesn't output anything itself
+    :param profile: Run the build under cProfile and write the statistics to this file.
+    Work done by worker processes is not part of the profile
+    :param black_compatible: Render the python files the way black would format them, so
+    format_with_black can be disabled
+    :param verify_sample: The amount of modules to check with verify_black_compatible
+    before building black compatible
+    :param write_queue_size: The maximum amount of rendered files waiting to be written.
+    Files are written on a separate thread while the next ones are rendered
+    :param target: Write the package as a tree of files in the build folder with "folder",
+    or straight into a single archive in the build folder with "wheel" or "sdist". The
+    build folder isn't cleared for archives and a wheel only holds the package itself
+    :param compute_imports: Add the imports needed by the type hints and base classes to
+    every module with resolve_imports before building. This updates the modules
+    :param max_module_classes: Shard modules with more classes than this into several
+    files with ModuleComponent.shard, keeping the original import path working
+    :param compile_bytecode: Write the __pycache__ .pyc files of all python files after
+    building, using the jobs worker processes. The .pyc files are invalidated by the hash
+    of their source, so they stay valid when the build folder is copied
+    :param optimization_levels: The optimization levels to write .pyc files for
+    :param deduplicate_definitions: Move identical methods and functions into shared
+    mixins and functions with deduplicate before building. This updates the package
+    :param validate: Compile every module with validate_modules, using the jobs worker
+    processes, before anything is formatted or written. A ModuleValidationError listing
+    every broken module and the component causing it is raised when any doesn't compile
     """
-    if build_folder.exists:
-        print(f"Deleting existing folder '{build_folder}'")
-        shutil.rmtree(build_folder, ignore_errors=True)
+    if jobs is not None and jobs < 1:
+        raise ValueError("jobs should be at least 1")
 
-    print(f"Creating build folder '{build_folder}'")
-    build_folder.mkdir()
+    if target not in ("folder", "wheel", "sdist"):
+        raise ValueError(f"Unknown build target '{target}'")
 
-    if create_pyproject_file:
-        print("Writing pyproject.toml file")
-        write_file(
-            package.pyproject(),
-            Path(build_folder, "pyproject.toml"),
-            format_with_black=False,
-        )
+    if incremental and target != "folder":
+        raise ValueError("Only folder targets can be built incrementally")
 
-    if create_setup_file:
-        print("Writing setup.cfg file")
-        write_file(
-            package.setup_text(),
-            Path(build_folder, "setup.cfg"),
-            format_with_black=False,
-        )
+    if compile_bytecode and target != "folder":
+        raise ValueError("Bytecode can only be compiled for folder targets")
 
-    if create_readme_file:
-        print("Wrinting README.md file")
-        write_file(
-            package.readme_text(),
-            Path(build_folder, "README.md"),
-            format_with_black=False,
-        )
+    start = time.perf_counter()
+
+    def emit(kind: str, path: Union[str, Path], **fields):
+        """Send an event to the event sink, if any."""
+        if events is not None:
+            events(
+                BuildEvent(
+                    kind,
+                    str(path),
+                    elapsed_seconds=time.perf_counter() - start,
+                    **fields,
+                )
+            )
+
+    with _profiled(profile):
+        emit(BUILD_STARTED, build_folder)
+
+        if deduplicate_definitions:
+            deduplicate(package)
+
+        if compute_imports:
+            resolve_imports(package)
+
+        if incremental:
+            previous_manifest = Manifest.load(build_folder)
+        else:
+            previous_manifest = Manifest()
+            if target == "folder" and build_folder.exists():
+                shutil.rmtree(build_folder, ignore_errors=True)
+                emit(FOLDER_REMOVED, build_folder)
+
+        build_folder.mkdir(parents=True, exist_ok=True)
+        emit(FOLDER_CREATED, build_folder)
+
+        manifest = Manifest()
+        if target == "wheel":
+            writer = WheelWriter(package, build_folder, write_queue_size)
+        elif target == "sdist":
+            writer = SdistWriter(package, build_folder, write_queue_size)
+        else:
+            writer = FileWriter(build_folder, write_queue_size)
+
+        def write_output(
+            relative_path: str,
+            content_hash: str,
+            content: Optional[str],
+            format_with_black: bool = True,
+            module: str = "",
+            render_seconds: float = 0.0,
+            format_seconds: float = 0.0,
+        ):
+            """Queue a file of the build unless it is unchanged since the previous build."""
+            if content is None or previous_manifest.is_current(
+                relative_path, content_hash, build_folder
+            ):
+                manifest.entries[relative_path] = previous_manifest.entries[
+                    relative_path
+                ]
+                emit(FILE_UNCHANGED, relative_path, module=module)
+                return
+
+            if format_with_black:
+                format_start = time.perf_counter()
+                content = format_text(content, format_cache)
+                format_seconds += time.perf_counter() - format_start
+
+            def written(write_seconds: float):
+                """Record the file once the writer has written it."""
+                manifest.record(relative_path, content_hash, hash_text(content))
+                emit(
+                    FILE_WRITTEN,
+                    relative_path,
+                    module=module,
+                    render_seconds=render_seconds,
+                    format_seconds=format_seconds,
+                    write_seconds=write_seconds,
+                    size=len(content.encode("utf-8")),
+                    line_count=content.count("\n"),
+                )
+
+            writer.write(relative_path, content, written)
+            writer.collect()
+
+        def render_output(
+            relative_path: str, render: Callable[[], str], format_with_black: bool
+        ):
+            """Render and write one of the files of the build which isn't a module."""
+            render_start = time.perf_counter()
+            content = render()
+            render_seconds = time.perf_counter() - render_start
+
+            write_output(
+                relative_path,
+                input_hash(content, format_with_black),
+                content,
+                format_with_black,
+                render_seconds=render_seconds,
+            )
+
+        with writer:
+            packages = list(_walk_packages(package, package.name))
+
+            # Modules given as generators, like those of the loaders, are rendered as they
+            # are produced. Modules that are in memory already are collected, so the
+            # biggest can be rendered first. Checks run before anything is written.
+            exports: Dict[str, List[str]] = {}
+            modules: Iterable[Tuple[ModuleComponent, str]] = _iter_module_files(
+                packages, max_module_classes, exports
+            )
+            if validate or (black_compatible and verify_sample) or jobs != 1:
+                modules = _materialise_bodies(modules)
+
+            if (
+                validate
+                or (black_compatible and verify_sample)
+                or all(
+                    isinstance(subpackage.modules, list) for subpackage, _ in packages
+                )
+            ):
+                modules = list(modules)
+
+            if validate:
+                problems = validate_modules(modules, jobs, black_compatible)
+                if problems:
+                    raise ModuleValidationError(problems)
+
+            if black_compatible and verify_sample:
+                verify_black_compatible(
+                    [module for module, _ in modules], verify_sample
+                )
+
+            # Create the folders of all (sub)packages in one go, so the modules of the
+            # whole tree can be rendered and written together afterwards.
+            for folder in writer.create_folders(folder for _, folder in packages):
+                emit(FOLDER_CREATED, folder)
+
+            if create_pyproject_file and writer.project_files:
+                render_output("pyproject.toml", package.pyproject, False)
+
+            if create_setup_file and writer.project_files:
+                render_output("setup.cfg", package.setup_text, False)
+
+            if create_readme_file and writer.project_files:
+                render_output("README.md", package.readme_text, False)
+
+            # The __init__.py files re-exporting their modules are written once all
+            # modules went by, so the modules only have to be consumed once.
+            for subpackage, folder in packages:
+                if not subpackage.export_modules:
+                    render_output(
+                        f"{folder}/__init__.py",
+                        partial(subpackage.init_text, black_compatible),
+                        format_with_black,
+                    )
+
+            def previous_hash(relative_path: str) -> Optional[str]:
+                """Returns the input hash of a file if it wasn't changed on disk."""
+                if previous_manifest.matches_disk(relative_path, build_folder):
+                    return previous_manifest.input_hash(relative_path)
+
+                return None
+
+            for module, relative_path, rendered in _render_modules(
+                modules,
+                build_folder if target == "folder" else None,
+                jobs,
+                previous_hash,
+                format_with_black,
+                format_cache,
+                black_compatible,
+            ):
+                if rendered.output_hash is not None:
+                    manifest.record(
+                        relative_path, rendered.input_hash, rendered.output_hash
+                    )
+                    emit(
+                        FILE_WRITTEN,
+                        relative_path,
+                        module=module.name,
+                        render_seconds=rendered.render_seconds,
+                        write_seconds=rendered.write_seconds,
+                        size=rendered.size,
+                        line_count=rendered.line_count,
+                    )
+                    continue
+
+                write_output(
+                    relative_path,
+                    rendered.input_hash,
+                    rendered.content,
+                    False,
+                    module=module.name,
+                    render_seconds=rendered.render_seconds,
+                    format_seconds=rendered.format_seconds,
+                )
+
+            for subpackage, folder in packages:
+                if subpackage.export_modules:
+                    render_output(
+                        f"{folder}/__init__.py",
+                        partial(
+                            subpackage.init_text, black_compatible, exports.get(folder)
+                        ),
+                        format_with_black,
+                    )
+
+        for relative_path in previous_manifest.entries.keys() - manifest.entries.keys():
+            location = Path(build_folder, relative_path)
+            location.unlink(missing_ok=True)
+            emit(FILE_REMOVED, relative_path)
+
+            if location.suffix == ".py":
+                for cache_location in cache_locations(location, (0, 1, 2)):
+                    cache_location.unlink(missing_ok=True)
+
+                cache_folder = Path(location.parent, "__pycache__")
+                if cache_folder.is_dir() and not any(cache_folder.iterdir()):
+                    cache_folder.rmdir()
+
+            # Remove the folders of packages that are no longer part of the build
+            for folder in location.parents:
+                if folder == build_folder or any(folder.iterdir()):
+                    break
+                folder.rmdir()
+                emit(FOLDER_REMOVED, folder)
+
+        if compile_bytecode:
+            python_files = [
+                Path(build_folder, relative_path)
+                for relative_path in manifest.entries
+                if relative_path.endswith(".py")
+            ]
+            for location, cache_files in compile_files(
+                python_files, jobs, optimization_levels
+            ):
+                if cache_files:
+                    emit(
+                        BYTECODE_COMPILED,
+                        location.relative_to(build_folder),
+                        size=sum(
+                            cache_file.stat().st_size for cache_file in cache_files
+                        ),
+                    )
+
+        if target == "folder":
+            manifest.save(build_folder)
+        else:
+            emit(
+                ARCHIVE_CREATED,
+                writer.location,
+                size=writer.location.stat().st_size,
+            )
 
-    print("Creating package folder")
-    package_folder = Path(build_folder, package.name)
-    package_folder.mkdir()
-    write_file(package.init_text(), Path(package_folder, "__init__.py"))
+        if format_cache is not None:
+            format_cache.prune()
 
-    for module in package.modules:
-        print(f"Creating module {module.name}")
-        write_file(module.text(), Path(package_folder, f"{module.name}.py"))
+        emit(BUILD_FINISHED, build_folder)
@@ -0,0 +1,111 @@
+import importlib.util
+import os
+import py_compile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+CHECKED_HASH = py_compile.PycInvalidationMode.CHECKED_HASH
+UNCHECKED_HASH = py_compile.PycInvalidationMode.UNCHECKED_HASH
+
+# The flags in the header of a hash-based .pyc file, see PEP 552
+_HASH_FLAGS = {CHECKED_HASH: 0b11, UNCHECKED_HASH: 0b01}
+
+
+def cache_locations(location: Path, optimization_levels: Sequence[int]) -> List[Path]:
+    """Returns the __pycache__ files of a python file for the given optimization levels."""
+    return [
+        Path(
+            importlib.util.cache_from_source(
+                str(location), optimization=optimization if optimization else ""
+            )
+        )
+        for optimization in optimization_levels
+    ]
+
+
+def _is_current(cache_location: Path, source_hash: bytes, flags: int) -> bool:
+    """Returns if the .pyc file was compiled from source with the given hash."""
+    try:
+        with open(cache_location, "rb") as f:
+            header = f.read(16)
+    except OSError:
+        return False
+
+    return (
+        header[:4] == importlib.util.MAGIC_NUMBER
+        and int.from_bytes(header[4:8], "little") == flags
+        and header[8:16] == source_hash
+    )
+
+
+def compile_file(
+    location: Path,
+    optimization_levels: Sequence[int] = (0,),
+    invalidation_mode: py_compile.PycInvalidationMode = CHECKED_HASH,
+) -> List[Path]:
+    """Write the bytecode of a python file to its __pycache__ folder.
+
+    The .pyc files hold the hash of the source instead of its modification time, so they
+    stay valid when the files are copied. Returns the .pyc files that were written, files
+    already compiled from the same source are left alone.
+
+    :param location: The python file to compile
+    :param optimization_levels: The optimization levels to write a .pyc file for
+    :param invalidation_mode: CHECKED_HASH makes the interpreter compare the hash with the
+    source on import, with UNCHECKED_HASH the .pyc file is always used
+    """
+    source_hash = importlib.util.source_hash(location.read_bytes())
+    written = []
+    for optimization, cache_location in zip(
+        optimization_levels, cache_locations(location, optimization_levels)
+    ):
+        if _is_current(cache_location, source_hash, _HASH_FLAGS[invalidation_mode]):
+            continue
+
+        py_compile.compile(
+            str(location),
+            cfile=str(cache_location),
+            doraise=True,
+            optimize=optimization,
+            invalidation_mode=invalidation_mode,
+        )
+        written.append(cache_location)
+
+    return written
+
+
+def compile_files(
+    locations: List[Path],
+    jobs: Optional[int] = 1,
+    optimization_levels: Sequence[int] = (0,),
+    invalidation_mode: py_compile.PycInvalidationMode = CHECKED_HASH,
+) -> Iterator[Tuple[Path, List[Path]]]:
+    """Compile python files, yielding every file with the .pyc files written for it.
+
+    With more than one job the files are spread over a process pool. A py_compile error is
+    raised for the first file that doesn't compile.
+
+    :param locations: The python files to compile
+    :param jobs: The amount of worker processes to use. None uses all available CPUs
+    :param optimization_levels: The optimization levels to write a .pyc file for
+    :param invalidation_mode: How the interpreter checks if the .pyc files are current
+    """
+    if jobs == 1 or len(locations) <= 1:
+        for location in locations:
+            yield location, compile_file(
+                location, optimization_levels, invalidation_mode
+            )
+        return
+
+    # Compiling a single file is quick, so hand them to the workers in batches
+    chunk_size = max(1, len(locations) // (4 * (jobs or os.cpu_count() or 1)))
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        results = executor.map(
+            compile_file,
+            locations,
+            [optimization_levels] * len(locations),
+            [invalidation_mode] * len(locations),
+            chunksize=chunk_size,
+        )
+        yield from zip(locations, results)
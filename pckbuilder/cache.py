@@ -0,0 +1,114 @@
+import black
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional
+from .utils import hash_text
+
+
+def default_cache_folder() -> Path:
+    """Returns the default folder for the pckbuilder caches."""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path(Path.home(), ".cache")
+    return Path(cache_home, "pckbuilder")
+
+
+class FormatCache:
+    """On disk cache of black formatted source code.
+
+    Entries are keyed by the hash of the unformatted text together with the black version
+    and mode, so upgrading black or changing the mode never returns stale results. Every
+    entry is a separate file which is written atomically, this makes it safe to share the
+    cache between multiple build processes. The modification time of an entry is updated
+    on every hit and is used to evict the least recently used entries once the cache grows
+    beyond its maximum size.
+    """
+
+    def __init__(
+        self,
+        folder: Optional[Path] = None,
+        max_size: int = 256 * 1024 * 1024,
+        mode: Optional[black.Mode] = None,
+    ):
+        """Initialise the cache.
+
+        :param folder: The folder to store the cache entries in
+        :param max_size: The maximum size of all cache entries in bytes
+        :param mode: The black mode to format with
+        """
+        self.folder = Path(folder) if folder else Path(default_cache_folder(), "black")
+        self.max_size = max_size
+        self.mode = mode or black.Mode()  # type: ignore
+
+    def __repr__(self) -> str:
+        """Pretty representation of class instance."""
+        return f"<FormatCache '{self.folder}'>"
+
+    def key(self, content: str) -> str:
+        """Returns the cache key of the given unformatted text."""
+        return hash_text(black.__version__, repr(self.mode), content)
+
+    def _entry_path(self, key: str) -> Path:
+        """Returns the location of the cache entry with given key."""
+        return Path(self.folder, key[:2], f"{key}.py")
+
+    def get(self, content: str) -> Optional[str]:
+        """Returns the formatted text of the given content if it is cached."""
+        location = self._entry_path(self.key(content))
+        try:
+            with open(location, encoding="utf-8") as f:
+                formatted = f.read()
+            os.utime(location)
+        except OSError:
+            return None
+
+        return formatted
+
+    def put(self, content: str, formatted: str):
+        """Store the formatted text of the given content in the cache."""
+        location = self._entry_path(self.key(content))
+        location.parent.mkdir(parents=True, exist_ok=True)
+
+        descriptor, temporary_location = tempfile.mkstemp(
+            dir=location.parent, suffix=".tmp"
+        )
+        try:
+            with os.fdopen(descriptor, "w", encoding="utf-8") as f:
+                f.write(formatted)
+            os.replace(temporary_location, location)
+        except OSError:
+            Path(temporary_location).unlink(missing_ok=True)
+
+    def format(self, content: str) -> str:
+        """Format the given text with black, using the cached result when available."""
+        formatted = self.get(content)
+        if formatted is None:
+            formatted = black.format_str(content, mode=self.mode)
+            self.put(content, formatted)
+
+        return formatted
+
+    def prune(self):
+        """Remove the least recently used entries until the cache fits its maximum size."""
+        entries = []
+        total_size = 0
+        for location in self.folder.glob("*/*.py"):
+            try:
+                stat = location.stat()
+            except OSError:
+                continue
+
+            entries.append((stat.st_mtime, stat.st_size, location))
+            total_size += stat.st_size
+
+        entries.sort()
+        for _, size, location in entries:
+            if total_size <= self.max_size:
+                break
+
+            location.unlink(missing_ok=True)
+            total_size -= size
+
+    def clear(self):
+        """Remove all entries from the cache."""
+        for location in self.folder.glob("*/*.py"):
+            location.unlink(missing_ok=True)
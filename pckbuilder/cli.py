@@ -0,0 +1,185 @@
+"""Build a package from a declarative spec file.
+
+Usage: pckbuilder spec.json [--output packagebuild/] [--jobs 4] [--incremental]
+
+The spec file declares the package and the arguments of the build, see parse_spec.
+Options given on the command line override the build arguments of the spec.
+"""
+import argparse
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from .build import ModuleBuildError, build
+from .cache import FormatCache
+from .events import BuildReport, print_event
+from .spec import load_spec
+from .validate import ModuleValidationError
+
+
+def _jobs(value: str) -> Optional[int]:
+    """Returns the amount of worker processes of the --jobs option."""
+    if value == "auto":
+        return None
+
+    jobs = int(value)
+    if jobs < 1:
+        raise argparse.ArgumentTypeError("should be at least 1, or auto")
+
+    return jobs
+
+
+def parser() -> argparse.ArgumentParser:
+    """Returns the parser of the command line arguments."""
+    argument_parser = argparse.ArgumentParser(
+        prog="pckbuilder", description=__doc__.splitlines()[0]
+    )
+    argument_parser.add_argument(
+        "spec", type=Path, help="JSON spec file or snapshot of the package"
+    )
+    argument_parser.add_argument(
+        "-o",
+        "--output",
+        type=Path,
+        dest="build_folder",
+        metavar="FOLDER",
+        help="The build folder",
+    )
+    argument_parser.add_argument(
+        "-j",
+        "--jobs",
+        type=_jobs,
+        default=argparse.SUPPRESS,
+        metavar="N",
+        help="Amount of worker processes, auto uses all available CPUs",
+    )
+
+    mode = argument_parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--incremental",
+        action="store_const",
+        const=True,
+        dest="incremental",
+        help="Only write files that changed since the previous build",
+    )
+    mode.add_argument(
+        "--clean",
+        action="store_const",
+        const=False,
+        dest="incremental",
+        help="Remove the build folder before building",
+    )
+
+    formatting = argument_parser.add_mutually_exclusive_group()
+    formatting.add_argument(
+        "--format",
+        action="store_const",
+        const=True,
+        dest="format_with_black",
+        help="Format the modules with black",
+    )
+    formatting.add_argument(
+        "--no-format",
+        action="store_const",
+        const=False,
+        dest="format_with_black",
+        help="Stream the modules to their files without formatting them",
+    )
+    argument_parser.add_argument(
+        "--black-compatible",
+        action="store_const",
+        const=True,
+        help="Render the modules the way black would format them",
+    )
+    argument_parser.add_argument(
+        "--format-cache",
+        type=Path,
+        nargs="?",
+        const=True,
+        metavar="FOLDER",
+        help="Cache formatted modules, in the default cache folder if none is given",
+    )
+    argument_parser.add_argument(
+        "--validate",
+        action="store_const",
+        const=True,
+        help="Compile every module before anything is formatted or written",
+    )
+    argument_parser.add_argument(
+        "--target", choices=("folder", "wheel", "sdist"), help="What to build"
+    )
+    argument_parser.add_argument(
+        "--compile-bytecode",
+        action="store_const",
+        const=True,
+        help="Write the __pycache__ files of the modules",
+    )
+    argument_parser.add_argument(
+        "--profile", type=Path, metavar="FILE", help="Write cProfile statistics to FILE"
+    )
+
+    output = argument_parser.add_mutually_exclusive_group()
+    output.add_argument(
+        "-v", "--verbose", action="store_true", help="Print every build event"
+    )
+    output.add_argument(
+        "-q", "--quiet", action="store_true", help="Don't print the build summary"
+    )
+    return argument_parser
+
+
+def build_options(options: argparse.Namespace, spec_options: Dict[str, Any]):
+    """Returns the build arguments of the spec, overridden by the command line options."""
+    arguments = dict(spec_options)
+    for name in (
+        "build_folder",
+        "jobs",
+        "incremental",
+        "format_with_black",
+        "black_compatible",
+        "validate",
+        "target",
+        "compile_bytecode",
+        "profile",
+    ):
+        value = getattr(options, name, None)
+        if value is not None or (name == "jobs" and hasattr(options, name)):
+            arguments[name] = value
+
+    if options.format_cache is not None:
+        folder = None if options.format_cache is True else options.format_cache
+        arguments["format_cache"] = FormatCache(folder)
+
+    return arguments
+
+
+def main(arguments: Optional[List[str]] = None) -> int:
+    """Script entrypoint, returns the exit status."""
+    options = parser().parse_args(arguments)
+
+    try:
+        spec = load_spec(options.spec)
+    except (OSError, ValueError) as error:
+        print(f"pckbuilder: error: {error}", file=sys.stderr)
+        return 2
+
+    report = BuildReport()
+    if options.verbose:
+
+        def events(event):
+            """Print every event while collecting them for the summary."""
+            print_event(event)
+            report(event)
+
+    else:
+        events = report
+
+    try:
+        build(spec.package, events=events, **build_options(options, spec.options))
+    except (ModuleBuildError, ModuleValidationError, OSError, ValueError) as error:
+        print(f"pckbuilder: error: {error}", file=sys.stderr)
+        return 1
+
+    if not options.quiet:
+        print(report.summary(), file=sys.stderr)
+
+    return 0
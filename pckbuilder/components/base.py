@@ -0,0 +1,208 @@
+from functools import wraps
+from operator import attrgetter
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+
+# Field values which are compared by value when fingerprinting components
+_SCALAR_TYPES = {str, int, float, bool, bytes, type(None)}
+
+# Marks the fingerprint of a child component, so it can't be mistaken for a field value
+_COMPONENT = object()
+
+# The render cache of the current render pass, see RenderCache
+_active_cache: Optional["RenderCache"] = None
+
+
+class Component:
+    """Base of the components.
+
+    Components are plain data, their fields can be changed in place at any time. The text
+    they render is only kept while a RenderCache is used.
+    """
+
+    __slots__ = ()
+
+    _field_names: Tuple[str, ...] = ()
+    _field_values: Callable[["Component"], tuple] = staticmethod(lambda _: ())
+    _memoized = False
+
+    def __init_subclass__(cls, **kwargs):
+        """Collect the names of the fields of every component class."""
+        super().__init_subclass__(**kwargs)
+        cls._field_names = tuple(
+            name
+            for klass in reversed(cls.__mro__)
+            for name in klass.__dict__.get("__slots__", ())
+        )
+        if len(cls._field_names) > 1:
+            cls._field_values = staticmethod(attrgetter(*cls._field_names))
+        cls._memoized = any(
+            getattr(value, "memoized", False)
+            for klass in cls.__mro__
+            for value in vars(klass).values()
+        )
+
+
+class RenderCache:
+    """Keeps the text rendered by components from one render pass to the next.
+
+    Components render from scratch by default. Rendering inside a with block of a cache is
+    a render pass: every component is fingerprinted by its fields and those of its
+    children, including the contents of lists like the methods of a class, and the text a
+    component rendered in an earlier pass is used again when its fingerprint didn't change.
+    A method shared by many classes is then rendered once per change instead of once per
+    class, and regenerating a package after changing a single method only renders what the
+    method is part of.
+
+    Components shouldn't be changed during a pass. Bodies rendered by a callable or
+    generator can't be fingerprinted, so they and the components holding them are never
+    cached. The cache keeps the components it rendered alive until it is cleared.
+    """
+
+    def __init__(self):
+        """Initialise an empty cache."""
+        self._states: Dict[int, Tuple[Component, tuple, int]] = {}
+        self._texts: Dict[tuple, Tuple[Component, int, str]] = {}
+        self._pass_tokens: Dict[int, int] = {}
+        self._volatile_tokens: Set[int] = set()
+        self._volatile = False
+        self._last_token = 0
+        self._previous: Optional[RenderCache] = None
+
+    def __repr__(self) -> str:
+        """Pretty representation of class instance."""
+        return f"<RenderCache '{len(self._texts)} texts'>"
+
+    def __enter__(self) -> "RenderCache":
+        """Start a render pass, rendering with this cache."""
+        global _active_cache
+        self._previous = _active_cache
+        self._pass_tokens = {}
+        self._volatile_tokens = set()
+        _active_cache = self
+        return self
+
+    def __exit__(self, *exc_info):
+        """End the render pass."""
+        global _active_cache
+        _active_cache = self._previous
+        self._previous = None
+        self._pass_tokens = {}
+        self._volatile_tokens = set()
+
+    def clear(self):
+        """Forget all rendered text and the components it was rendered from."""
+        self._states.clear()
+        self._texts.clear()
+
+    def _state(self, value: Any) -> Any:
+        """Returns the fingerprint of a field value."""
+        if value.__class__ in _SCALAR_TYPES:
+            return value
+
+        if isinstance(value, Component):
+            if value._memoized:
+                return (_COMPONENT, self.token(value))
+
+            # Components without cached text are cheaper to fingerprint in place
+            return (value.__class__, self._fields_state(value))
+
+        if isinstance(value, (list, tuple, set, frozenset)):
+            return (value.__class__, tuple([self._state(item) for item in value]))
+
+        if isinstance(value, dict):
+            return (
+                dict,
+                tuple(
+                    [
+                        (self._state(key), self._state(item))
+                        for key, item in value.items()
+                    ]
+                ),
+            )
+
+        # Callables and generators render differently every time
+        self._volatile = True
+        return object()
+
+    def _fields_state(self, component: Component) -> tuple:
+        """Returns the fingerprint of the fields of a component."""
+        try:
+            values = component._field_values(component)
+        except AttributeError:
+            values = tuple(
+                getattr(component, name, None) for name in component._field_names
+            )
+
+        scalar_types = _SCALAR_TYPES
+        return tuple(
+            [
+                value if value.__class__ in scalar_types else self._state(value)
+                for value in values
+            ]
+        )
+
+    def token(self, component: Component) -> int:
+        """Returns the token of the current fields of a component and its children.
+
+        The token stays the same from one pass to the next as long as the component and its
+        children don't change.
+        """
+        key = id(component)
+        token = self._pass_tokens.get(key)
+        if token is not None:
+            if token in self._volatile_tokens:
+                self._volatile = True
+            return token
+
+        outer_volatile = self._volatile
+        self._volatile = False
+        state = self._fields_state(component)
+        volatile = self._volatile
+        self._volatile = outer_volatile or volatile
+
+        known = self._states.get(key)
+        if volatile:
+            self._last_token += 1
+            token = self._last_token
+            self._volatile_tokens.add(token)
+            self._states.pop(key, None)
+        elif known is not None and known[0] is component and known[1] == state:
+            token = known[2]
+        else:
+            self._last_token += 1
+            token = self._last_token
+            self._states[key] = (component, state, token)
+
+        self._pass_tokens[key] = token
+        return token
+
+    def render(self, component: Component, render, args: tuple, kwargs: dict) -> str:
+        """Returns the text of a component, rendering it when it changed."""
+        token = self.token(component)
+        if token in self._volatile_tokens:
+            return render(component, *args, **kwargs)
+
+        key = (id(component), render, args, tuple(sorted(kwargs.items())))
+        cached = self._texts.get(key)
+        if cached is not None and cached[0] is component and cached[1] == token:
+            return cached[2]
+
+        text = render(component, *args, **kwargs)
+        self._texts[key] = (component, token, text)
+        return text
+
+
+def memoized(render):
+    """Use the text of a render method kept by the active RenderCache, if any."""
+
+    @wraps(render)
+    def wrapper(self: Component, *args, **kwargs):
+        """Returns the text from the active render cache, or renders it."""
+        cache = _active_cache
+        if cache is None:
+            return render(self, *args, **kwargs)
+
+        return cache.render(self, render, args, kwargs)
+
+    wrapper.memoized = True  # type: ignore
+    return wrapper
@@ -1,15 +1,28 @@
+from .base import Component, memoized
 from .method import MethodComponent
-from typing import List, Optional
+from typing import List, Optional, Set
 from .variable import VariableComponent
-from ..utils import Text
+from ..utils import Text, python_literal, split_brackets
 
 
-class ClassComponent:
+class ClassComponent(Component):
     """A template for creating user-defined objects.
 
     Class definitions normally contain method definitions which operate on instances of the class.
     """
 
+    __slots__ = (
+        "name",
+        "description",
+        "class_arguments",
+        "methods",
+        "base_class_name",
+        "base_class",
+        "slots",
+        "dataclass",
+        "frozen",
+    )
+
     def __init__(
         self,
         name: str,
@@ -17,19 +30,111 @@ class ClassComponent:
         class_arguments: Optional[List[VariableComponent]] = None,
         methods: Optional[List[MethodComponent]] = None,
         base_class_name: Optional[str] = None,
+        base_class: Optional["ClassComponent"] = None,
+        slots: bool = False,
+        dataclass: bool = False,
+        frozen: bool = False,
     ):
-        """Initialize ClassComponent instance."""
+        """Initialize ClassComponent instance.
+
+        :param base_class_name: The name of the class to inherit from
+        :param base_class: The ClassComponent to inherit from, when it is generated too. This
+        sets the base_class_name and keeps slots from being repeated along the inheritance
+        chain
+        :param slots: Store the class arguments in __slots__ instead of an instance __dict__.
+        Without dataclass, class arguments with a value are kept as class attributes and
+        aren't part of the slots
+        :param dataclass: Generate a dataclass, which requires Python 3.10 for slots. The
+        module imports the dataclass decorator when its imports don't include it. Mutable
+        defaults like lists, dicts and sets raise a ValueError, as dataclasses refuse them
+        :param frozen: Generate a frozen dataclass
+        """
         self.name = name
         self.description = description
         self.class_arguments = class_arguments or []
         self.methods = methods or []
 
-        self.base_class_name = base_class_name
+        if frozen and not dataclass:
+            raise ValueError("Only dataclasses can be frozen")
+
+        # Dataclasses refuse unhashable defaults, as every instance would share them
+        for argument in self.class_arguments if dataclass else []:
+            if argument.value is not None and argument.value.__class__.__hash__ is None:
+                raise ValueError(
+                    f"Dataclass argument '{argument.name}' can't have a mutable default"
+                )
+
+        self.base_class = base_class
+        self.base_class_name = base_class_name or (base_class and base_class.name)
+        self.slots = slots
+        self.dataclass = dataclass
+        self.frozen = frozen
+
+    @property
+    def decorators(self) -> List[str]:
+        """Returns the decorator lines to put above the class definition."""
+        if not self.dataclass:
+            return []
+
+        options = []
+        if self.slots:
+            options.append("slots=True")
+        if self.frozen:
+            options.append("frozen=True")
+
+        return [f"@dataclass({', '.join(options)})" if options else "@dataclass"]
+
+    def inherited_slots(self) -> Set[str]:
+        """Returns the slots defined by the generated base classes of this class."""
+        slots: Set[str] = set()
+        base_class = self.base_class
+        while base_class is not None:
+            slots.update(base_class.slot_names())
+            base_class = base_class.base_class
+
+        return slots
+
+    def slot_names(self) -> List[str]:
+        """Returns the names to put in the __slots__ of the class.
+
+        Dataclasses generate their own slots, so these are only written for other classes.
+        Names already in the slots of a generated base class are left out.
+        """
+        if not self.slots or self.dataclass:
+            return []
+
+        inherited_slots = self.inherited_slots()
+        return [
+            argument.name
+            for argument in self.class_arguments
+            if not argument.value and argument.name not in inherited_slots
+        ]
+
+    def _slots_text(self, black_compatible: bool, indent: int) -> str:
+        """Returns the __slots__ assignment of the class."""
+        names = tuple(self.slot_names())
+        if black_compatible:
+            slots = VariableComponent("__slots__", "", None, names)  # type: ignore
+            return slots.text(show_value=True, black_compatible=True, indent=indent + 4)
+
+        return f"__slots__ = {python_literal(names)}"
+
+    @memoized
+    def text(self, black_compatible=False, indent=0) -> str:
+        """Convert our class component to text.
+
+        :param black_compatible: Write the class the way black would format it
+        :param indent: The amount of spaces the class will be indented with, this
+        determines when black compatible lines are wrapped
+        """
+        if black_compatible:
+            return self._black_text(indent)
 
-    def text(self) -> str:
-        """Convert our class component to text."""
         text = Text()
 
+        if self.decorators:
+            text.add(self.decorators)
+
         if self.base_class_name:
             text.add(f"class {self.name}({self.base_class_name}):")
         else:
@@ -37,6 +142,9 @@ class ClassComponent:
 
         text.add_docstring(self.description, indent=4, newlines=2)
 
+        if self.slots and not self.dataclass:
+            text.add(self._slots_text(False, indent), indent=4, newlines=2)
+
         for argument in self.class_arguments:
             if argument.value:
                 show_value = True
@@ -50,3 +158,47 @@ class ClassComponent:
         text.add(self.methods, indent=4)
 
         return text.string
+
+    def _black_text(self, indent: int) -> str:
+        """Convert our class component to text the way black would format it."""
+        text = Text(black_compatible=True)
+
+        if self.decorators:
+            text.add(self.decorators)
+
+        if self.base_class_name:
+            text.add(
+                split_brackets(
+                    f"class {self.name}(", [self.base_class_name], "):", indent
+                )
+            )
+        else:
+            text.add(f"class {self.name}:")
+
+        text.add_docstring(self.description, indent=4)
+
+        if self.slots and not self.dataclass:
+            text.add_newline()
+            text.add(self._slots_text(True, indent), indent=4)
+
+        if self.class_arguments:
+            text.add_newline()
+
+        for argument in self.class_arguments:
+            text.add(
+                argument.text(
+                    show_value=bool(argument.value),
+                    black_compatible=True,
+                    indent=indent + 4,
+                ),
+                indent=4,
+            )
+
+        for method in self.methods:
+            text.add_newline()
+            if not isinstance(method, str):
+                method = method.text(black_compatible=True, indent=indent + 4)
+
+            text.add(method, indent=4)
+
+        return text.string
@@ -1,25 +1,44 @@
-from typing import List, Optional
+from typing import Callable, Iterable, List, Optional, Union
+from .base import Component, memoized
 from .variable import VariableComponent
 from .type import TypeComponent
-from ..utils import Text
+from ..utils import LINE_LENGTH, Text, split_brackets
 
+Body = Union[str, Iterable[str], Callable[[], Union[str, Iterable[str]]]]
 
-class FunctionComponent:
+
+class FunctionComponent(Component):
     """A function is a series of statements which returns some value to a caller.
 
     It can also be passed zero or more arguments which may be used in the execution of the body.
     """
 
+    __slots__ = (
+        "name",
+        "description",
+        "arguments",
+        "keyword_arguments",
+        "body",
+        "return_type",
+    )
+
     def __init__(
         self,
         name: str,
         description: str,
-        body: str,
+        body: Body,
         arguments: Optional[List[VariableComponent]] = None,
         keyword_arguments: Optional[List[VariableComponent]] = None,
         return_type: Optional[TypeComponent] = None,
     ):
-        """Initialise our FunctionComponent instance."""
+        """Initialise our FunctionComponent instance.
+
+        :param body: The body of the function. Besides a string this can be an iterable of
+        lines or a callable returning either of those. Callables are only called when the
+        function is rendered, so the body doesn't have to be kept in memory until then.
+        Use a module level function (or functools.partial) to render in worker processes
+        and note that a generator of lines can only be rendered once.
+        """
         self.name = name
         self.description = description
 
@@ -56,18 +75,75 @@ class FunctionComponent:
         text = text.rstrip(", ")
 
         if self.return_type:
-            text += f") -> {self.return_type.text}:"
+            text += f") -> {self.return_type.text()}:"
         else:
             text += f"):"
 
         return text
 
-    def text(self) -> str:
-        """Convert our function component to text."""
-        text = Text()
+    @property
+    def decorators(self) -> List[str]:
+        """Returns the decorator lines to put above the function definition."""
+        return []
+
+    @property
+    def leading_arguments(self) -> List[str]:
+        """Returns the implicit arguments preceding the function arguments."""
+        return []
+
+    def black_definition(self, indent: int = 0) -> str:
+        """Returns the function definition string the way black would format it.
+
+        The arguments are wrapped over multiple lines when the definition doesn't fit on
+        a single line.
 
-        text.add(self.function_definition)
+        :param indent: The amount of spaces the definition will be indented with
+        """
+        arguments = list(self.leading_arguments)
+        for argument in self.all_arguments:
+            arguments.append(argument.argument_text(show_value=bool(argument.value)))
+
+        if self.return_type:
+            tail = f") -> {self.return_type.text()}:"
+        else:
+            tail = "):"
+
+        head = f"def {self.name}("
+        # Black adds a trailing comma to a single argument, putting it on a line of its own
+        definition = split_brackets(
+            head, arguments, tail, indent, explode=len(arguments) == 1
+        )
+        body_length = indent + 4 + len(", ".join(arguments))
+        if "\n" in definition and (len(arguments) == 1 or body_length > LINE_LENGTH):
+            # Every argument ended up on a line of its own, which might need splitting too
+            arguments = list(self.leading_arguments)
+            for argument in self.all_arguments:
+                arguments.append(
+                    argument.argument_text(
+                        show_value=bool(argument.value), indent=indent + 4
+                    )
+                )
+
+            definition = split_brackets(head, arguments, tail, indent, explode=True)
+
+        return "\n".join(self.decorators + [definition])
+
+    @memoized
+    def text(self, black_compatible=False, indent=0) -> str:
+        """Convert our function component to text.
+
+        :param black_compatible: Write the function the way black would format it
+        :param indent: The amount of spaces the function will be indented with, this
+        determines when black compatible definitions are wrapped
+        """
+        text = Text(black_compatible)
+
+        if black_compatible:
+            text.add(self.black_definition(indent))
+        else:
+            text.add(self.function_definition)
         text.add_docstring(self.description, indent=4)
-        text.add(self.body, indent=4)
+        body = self.body() if callable(self.body) else self.body
+        text.add(body, indent=4)
 
         return text.string
@@ -1,4 +1,4 @@
-from .function import FunctionComponent
+from .function import Body, FunctionComponent
 from typing import List, Optional
 from .variable import VariableComponent
 from .type import TypeComponent
@@ -10,11 +10,13 @@ class MethodComponent(FunctionComponent):
     The key differentiator is that its first argument is (usually) self. In the case of a classmethod it can also be cls, or with staticmethod doesn't have a first method
     """
 
+    __slots__ = ("is_class_method", "is_static_method")
+
     def __init__(
         self,
         name: str,
         description: str,
-        body: str,
+        body: Body,
         arguments: Optional[List[VariableComponent]] = None,
         keyword_arguments: Optional[List[VariableComponent]] = None,
         return_type: Optional[TypeComponent] = None,
@@ -36,6 +38,24 @@ class MethodComponent(FunctionComponent):
         self.is_class_method = is_class_method
         self.is_static_method = is_static_method
 
+    @property
+    def decorators(self) -> List[str]:
+        """Returns the decorator lines to put above the method definition."""
+        if self.is_class_method:
+            return ["@classmethod"]
+
+        return []
+
+    @property
+    def leading_arguments(self) -> List[str]:
+        """Returns the cls or self argument of the method, if any."""
+        if self.is_class_method:
+            return ["cls"]
+        elif not self.is_static_method:
+            return ["self"]
+
+        return []
+
     @property
     def function_definition(self) -> str:
         """Returns the function definition string.
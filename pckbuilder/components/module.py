@@ -1,11 +1,25 @@
-from typing import Optional, List
+import re
+from typing import IO, Dict, Iterator, Optional, List
+from .base import Component
 from .variable import VariableComponent
 from ..utils import Text
 
+_DATACLASS_PATTERN = re.compile(r"\bdataclass\b")
 
-class ModuleComponent:
+
+class ModuleComponent(Component):
     """A python module is an object that serves as an organizational unit of Python code. Modules have a namespace containing arbitrary Python objects. Modules are loaded into Python by the process of importing."""
 
+    __slots__ = (
+        "name",
+        "description",
+        "imports",
+        "variables",
+        "classes",
+        "functions",
+        "executable_body",
+    )
+
     def __init__(
         self,
         name: str,
@@ -38,8 +52,47 @@ class ModuleComponent:
         """Pretty representation of class instance."""
         return f"<TypeComponent '{self.name}'>"
 
-    def text(self) -> str:
-        """Convert our type to text."""
+    def public_names(self) -> List[str]:
+        """Returns the names of the public classes, functions and variables of our module."""
+        return [
+            component.name
+            for components in (self.classes, self.functions, self.variables)
+            for component in components
+            if not isinstance(component, str) and not component.name.startswith("_")
+        ]
+
+    def rendered_imports(self) -> List[str]:
+        """Returns our imports, adding the dataclass decorator when a class needs it."""
+        imports = list(self.imports)
+        needs_dataclass = any(
+            not isinstance(class_, str) and class_.dataclass for class_ in self.classes
+        )
+        if needs_dataclass and not any(
+            _DATACLASS_PATTERN.search(statement) for statement in imports
+        ):
+            # __future__ imports have to stay first
+            position = 0
+            while position < len(imports) and imports[position].startswith(
+                "from __future__"
+            ):
+                position += 1
+
+            imports.insert(position, "from dataclasses import dataclass")
+
+        return imports
+
+    def iter_text(self, black_compatible=False) -> Iterator[str]:
+        """Convert our module to text, yielding it in pieces.
+
+        Every class and function is yielded as soon as it is rendered, so the full text of
+        the module never has to be held in memory at once.
+
+        :param black_compatible: Write the module the way black would format it
+        """
+        if black_compatible:
+            yield from self._iter_black_text()
+            return
+
         text = Text()
 
         if self.executable_body:
@@ -47,17 +100,261 @@ class ModuleComponent:
 
         text.add_docstring(self.description, newlines=2)
 
-        text.add(self.imports, newlines=2)
+        text.add(self.rendered_imports(), newlines=2)
 
         for variable_item in self.variables:
             text.add(variable_item.text(show_value=True))
         text.add_newline()
 
-        text.add(self.classes)
-        text.add(self.functions)
+        for components in (self.classes, self.functions):
+            for component in components:
+                text.add([component])
+                yield text.flush()
+
+            # Normalise the trailing newlines like adding all components at once would.
+            text.add([])
+
+        if self.executable_body:
+            text.add('if __name__ == "__main__":')
+            text.add(self.executable_body, indent=4)
+
+        yield text.string
+
+    def _iter_black_text(self) -> Iterator[str]:
+        """Convert our module to text the way black would format it, yielding it in pieces."""
+        text = Text(black_compatible=True)
+
+        if self.executable_body:
+            text.add_shebang()
+
+        text.add_docstring(self.description)
+
+        imports = self.rendered_imports()
+        if imports:
+            text.add_newline()
+            text.add(imports)
+
+        if self.variables:
+            text.add_newline()
+
+        for variable_item in self.variables:
+            text.add(variable_item.text(show_value=True, black_compatible=True))
+
+        has_definitions = False
+        for components in (self.classes, self.functions):
+            for component in components:
+                if not isinstance(component, str):
+                    component = component.text(black_compatible=True)
+
+                # Black leaves a single empty line between the docstring and a decorator
+                if (
+                    not has_definitions
+                    and not imports
+                    and not self.variables
+                    and component.startswith("@")
+                ):
+                    text.add_newline()
+                else:
+                    text.add_newline(2)
+
+                text.add(component)
+                has_definitions = True
+                yield text.flush()
 
         if self.executable_body:
+            text.add_newline(2 if has_definitions else 1)
             text.add('if __name__ == "__main__":')
             text.add(self.executable_body, indent=4)
 
-        return text.string
+        yield text.string
+
+    def shard(
+        self, max_classes: Optional[int] = None, max_bytes: Optional[int] = None
+    ) -> List["ModuleComponent"]:
+        """Split the classes of our module over several smaller modules.
+
+        Returns a module under the original name re-exporting all classes, functions and
+        variables, followed by the shards holding them. Our module itself is returned when
+        it doesn't need splitting.
+
+        The variables, functions and the classes other classes derive from are moved into
+        a base shard named `_<name>_base`, the other classes into shards named after our
+        module with a leading underscore and their index. The shards import from the base
+        shard directly. Classes of the other shards are imported after the definitions
+        when method bodies use them and in an if TYPE_CHECKING block when only type hints
+        do, so the shards can refer to each other without an import cycle. The shards are
+        private, they should be imported through the module under the original name, which
+        imports the base shard first. Callable and generator bodies can't be analysed, so
+        their shards import every class of the other shards.
+
+        :param max_classes: The maximum amount of classes in a shard
+        :param max_bytes: The maximum size of the classes in a shard. Classes are rendered
+        to measure them, so their bodies shouldn't be generators which render only once
+        """
+        from ..imports import (
+            annotation_names,
+            from_import,
+            merge_imports,
+            runtime_names,
+            type_checking_block,
+            used_names,
+        )
+
+        if not max_classes and not max_bytes:
+            raise ValueError("Sharding requires max_classes or max_bytes")
+
+        sizes = {
+            id(class_): len(class_.text().encode("utf-8")) if max_bytes else 0
+            for class_ in self.classes
+        }
+
+        def group(classes: list) -> List[list]:
+            groups: List[list] = [[]]
+            size = 0
+            for class_ in classes:
+                class_size = sizes[id(class_)]
+                group = groups[-1]
+                if group and (
+                    (max_classes and len(group) >= max_classes)
+                    or (max_bytes and size + class_size > max_bytes)
+                ):
+                    groups.append([])
+                    size = 0
+
+                groups[-1].append(class_)
+                size += class_size
+
+            return [group for group in groups if group]
+
+        if len(group(self.classes)) <= 1:
+            return [self]
+
+        # Base classes are needed as soon as a shard is imported
+        derived_from = runtime_names(self)
+        base_classes = [
+            class_ for class_ in self.classes if class_.name in derived_from
+        ]
+        groups = group(
+            [class_ for class_ in self.classes if class_.name not in derived_from]
+        )
+
+        base = ModuleComponent(
+            f"_{self.name}_base",
+            f"Base of the {self.name} module.",
+            variables=list(self.variables),
+            classes=base_classes,
+            functions=list(self.functions),
+        )
+        shards = [
+            ModuleComponent(
+                f"_{self.name}_{index}",
+                f"Part {index + 1} of the {self.name} module.",
+                classes=classes,
+            )
+            for index, classes in enumerate(groups)
+        ]
+        if base.variables or base.classes or base.functions:
+            shards.insert(0, base)
+
+        locations = {
+            component.name: shard.name
+            for shard in shards
+            for components in (shard.variables, shard.classes, shard.functions)
+            for component in components
+            if not isinstance(component, str)
+        }
+
+        for shard in shards:
+            body_names = used_names(
+                [method for class_ in shard.classes for method in class_.methods]
+                + list(shard.functions)
+            )
+            if body_names is None:
+                body_names = set(locations)
+
+            hinted_names = annotation_names(shard)
+            imports: Dict[str, List[str]] = {}
+            deferred_imports: Dict[str, List[str]] = {}
+            type_checking_imports: Dict[str, List[str]] = {}
+            for name in sorted(runtime_names(shard) | hinted_names | body_names):
+                location = locations.get(name, shard.name)
+                if location == shard.name:
+                    continue
+
+                if location == base.name:
+                    imports.setdefault(location, []).append(name)
+                elif name in body_names:
+                    deferred_imports.setdefault(location, []).append(name)
+                else:
+                    type_checking_imports.setdefault(location, []).append(name)
+
+            statements = list(self.imports) + [
+                from_import(f".{location}", names)
+                for location, names in imports.items()
+            ]
+            # Type hints can only refer to classes imported after the definitions once
+            # their evaluation is postponed
+            if type_checking_imports or any(
+                name in hinted_names
+                for names in deferred_imports.values()
+                for name in names
+            ):
+                statements.append("from __future__ import annotations")
+
+            if type_checking_imports:
+                statements.append("from typing import TYPE_CHECKING")
+                statements.append(
+                    type_checking_block(
+                        [
+                            from_import(f".{location}", names, 4)
+                            for location, names in type_checking_imports.items()
+                        ]
+                    )
+                )
+
+            shard.imports = merge_imports(statements)
+            if deferred_imports:
+                # Imported after the definitions, as the shards import each other
+                shard.functions = list(shard.functions) + [
+                    "\n".join(
+                        from_import(f".{location}", names)
+                        for location, names in sorted(deferred_imports.items())
+                    )
+                ]
+
+        exports = [
+            from_import(
+                f".{shard.name}",
+                [
+                    component.name
+                    for components in (shard.variables, shard.classes, shard.functions)
+                    for component in components
+                    if not isinstance(component, str)
+                ],
+            )
+            for shard in shards
+        ]
+        shim = ModuleComponent(
+            self.name,
+            self.description,
+            imports=list(self.imports) + exports,
+            executable_body=self.executable_body,
+        )
+
+        return [shim] + shards
+
+    def render_to(self, fp: IO[str], black_compatible=False):
+        """Write our module as text to the given file object.
+
+        :param fp: The file object to write to
+        :param black_compatible: Write the module the way black would format it
+        """
+        for chunk in self.iter_text(black_compatible):
+            fp.write(chunk)
+
+    def text(self, black_compatible=False) -> str:
+        """Convert our type to text.
+
+        :param black_compatible: Write the module the way black would format it
+        """
+        return "".join(self.iter_text(black_compatible))
@@ -1,6 +1,51 @@
-from typing import Optional, List
+import ast
+from typing import Dict, Iterable, Optional, List, Tuple
 from .module import ModuleComponent
-from ..utils import Text
+from ..utils import Text, string_literal
+
+_LAZY_IMPORT_FUNCTIONS = """\
+def __getattr__(name):
+    try:
+        module_name, attribute = _lazy_imports[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+
+    value = getattr(importlib.import_module(module_name, __name__), attribute)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_lazy_imports))"""
+
+
+def lazy_import_names(statement: str) -> Optional[Dict[str, Tuple[str, str]]]:
+    """Returns the names bound by a relative from-import with the module and attribute.
+
+    None is returned for any other statement, as those can't be imported lazily.
+
+    :param statement: An import statement like "from .models import User as Account"
+    """
+    try:
+        tree = ast.parse(statement)
+    except SyntaxError:
+        return None
+
+    if len(tree.body) != 1 or not isinstance(tree.body[0], ast.ImportFrom):
+        return None
+
+    node = tree.body[0]
+    if not node.level or not node.module:
+        return None
+
+    module = f"{'.' * node.level}{node.module}"
+    names = {}
+    for alias in node.names:
+        if alias.name == "*":
+            return None
+        names[alias.asname or alias.name] = (module, alias.name)
+
+    return names
 
 
 class PackageComponent:
@@ -9,27 +54,53 @@ class PackageComponent:
     Technically, a package is a Python module with a __path__ attribute.
     """
 
+    __slots__ = (
+        "name",
+        "description",
+        "version",
+        "modules",
+        "license",
+        "classifiers",
+        "install_requirements",
+        "keywords",
+        "imports",
+        "readme",
+        "subpackages",
+        "lazy_imports",
+        "export_modules",
+    )
+
     def __init__(
         self,
         name: str,
         description: str,
         version: str,
-        modules: Optional[List[ModuleComponent]] = None,
+        modules: Optional[Iterable[ModuleComponent]] = None,
         package_license: str = "MIT",
         classifiers: Optional[List[str]] = None,
         install_requirements: Optional[List[str]] = None,
         keywords: Optional[List[str]] = None,
         imports: Optional[List[str]] = None,
         readme: Optional[str] = None,
+        subpackages: Optional[List["PackageComponent"]] = None,
+        lazy_imports: bool = False,
+        export_modules: bool = False,
     ):
         """Initialize our PackageComponent.
 
         :param name: The name of the module
         :param description: The description of the module
         :param version: The version of the python package
-        :param modules: The list of modules part of this package
+        :param modules: The modules part of this package. This can be any iterable, like a
+        generator producing the modules one by one, which the build consumes only once
         :param imports: The list of imports to add to the package __init__.py file
         :param readme: The custom contents of the README.md file of this package
+        :param subpackages: The list of packages nested in this package. Only the modules,
+        imports and description of a subpackage are used when building
+        :param lazy_imports: Import the names of relative from-imports in the __init__.py
+        file on first access, instead of importing all modules with the package
+        :param export_modules: Import the public names of every module in the __init__.py
+        file. The names are collected while the modules are built
         """
         self.name = name
         self.description = description
@@ -45,6 +116,9 @@ class PackageComponent:
         self.keywords = keywords
         self.imports = imports or []
         self.readme = readme
+        self.subpackages = subpackages or []
+        self.lazy_imports = lazy_imports
+        self.export_modules = export_modules
 
     def pyproject(self, include_pytest=True, custom_data: Optional[str] = None) -> str:
         """Generate pyproject.toml contents."""
@@ -118,14 +192,112 @@ testpaths = [
 
         return text.string
 
-    def init_text(self) -> str:
-        """Generate __init__.py contents."""
+    def metadata_text(self) -> str:
+        """Generate the core metadata of the package.
+
+        This is the PKG-INFO file of a source distribution and the METADATA file of a wheel,
+        holding the same fields as the setup.cfg file with the README.md as description.
+        """
         text = Text()
+
+        text.add("Metadata-Version: 2.1")
+        text.add(f"Name: {self.name}")
+        text.add(f"Version: {self.version}")
+        text.add(f"Summary: {self.description}")
+        text.add(f"License: {self.license}")
+
+        if self.keywords:
+            text.add(f"Keywords: {','.join(self.keywords)}")
+
+        for classifier in self.classifiers:
+            text.add(f"Classifier: {classifier}")
+
+        for requirement in self.install_requirements or []:
+            text.add(f"Requires-Dist: {requirement}")
+
+        text.add("Description-Content-Type: text/markdown")
+        text.add_newline()
+        text.add(self.readme_text())
+
+        return text.string
+
+    def export_statement(self, module: ModuleComponent) -> Optional[str]:
+        """Returns the import of the public names of a module for the __init__.py file."""
+        from ..imports import from_import
+
+        names = module.public_names()
+        if not names:
+            return None
+
+        return from_import(f".{module.name}", names)
+
+    def init_text(
+        self, black_compatible=False, exports: Optional[List[str]] = None
+    ) -> str:
+        """Generate __init__.py contents.
+
+        :param black_compatible: Write the file the way black would format it
+        :param exports: Imports re-exporting the modules, added after our own imports
+        """
+        imports = list(self.imports) + (exports or [])
+        text = Text(black_compatible)
         text.add_docstring(f"{self.name} package.\n{self.description}")
-        text.add(self.imports)
+        if self.lazy_imports:
+            self._add_lazy_imports(text, imports)
+            return text.string
+
+        if black_compatible and imports:
+            text.add_newline()
+        text.add(imports)
 
         return text.string
 
+    def _add_lazy_imports(self, text: Text, imports: List[str]):
+        """Add the imports to the __init__.py text, loading them on first access.
+
+        A PEP 562 module __getattr__ imports the module of a name when it is first used.
+        The imports are repeated in a TYPE_CHECKING block for type checkers and IDEs.
+        Imports which aren't relative from-imports are still imported directly.
+        """
+        future_imports = []
+        eager_imports = []
+        lazy_imports = {}
+        lazy_statements = []
+        for statement in imports:
+            names = lazy_import_names(statement)
+            if statement.startswith("from __future__ "):
+                # Future statements have to come before any other statement of the module
+                future_imports.append(statement)
+            elif names is None:
+                eager_imports.append(statement)
+            else:
+                lazy_imports.update(names)
+                lazy_statements.append(statement)
+
+        text.add_newline()
+        if future_imports:
+            text.add(future_imports)
+        text.add("import importlib")
+        text.add(eager_imports)
+        text.add("from typing import TYPE_CHECKING", newlines=2)
+
+        if lazy_statements:
+            text.add("if TYPE_CHECKING:")
+            text.add(lazy_statements, indent=4, newlines=2)
+
+        if lazy_imports:
+            text.add("_lazy_imports = {")
+            for name, (module, attribute) in lazy_imports.items():
+                text.add(
+                    f"{string_literal(name)}: "
+                    f"({string_literal(module)}, {string_literal(attribute)}),",
+                    indent=4,
+                )
+            text.add("}", newlines=3)
+        else:
+            text.add("_lazy_imports = {}", newlines=3)
+        text.add(_LAZY_IMPORT_FUNCTIONS)
+
     def readme_text(self) -> str:
         """Generate README.md contents."""
         if self.readme:
@@ -1,3 +1,6 @@
+from typing import Dict, Tuple
+from .base import Component
+
 BUILTIN_TYPES = {
     "str",
     "int",
@@ -19,13 +22,19 @@ BUILTIN_GENERIC_TYPES = {
 }
 
 
-class TypeComponent:
+class TypeComponent(Component):
     """A Python type.
 
     This can be a builtin python type like str or int, or it could be a custom class defined
     in the package.
+
+    Use TypeComponent.intern to share a single instance between all identical types.
     """
 
+    __slots__ = ("name", "is_optional")
+
+    _interned: Dict[Tuple[str, bool], "TypeComponent"] = {}
+
     def __init__(self, name: str, is_optional: bool = False):
         """Initialize our class.
 
@@ -36,6 +45,24 @@ class TypeComponent:
         self.name = name
         self.is_optional = is_optional
 
+    @classmethod
+    def intern(cls, name: str, is_optional: bool = False) -> "TypeComponent":
+        """Returns the shared instance of the type with given name and optionality.
+
+        Large schemas contain the same few types for nearly every field, interning them
+        avoids creating a separate instance for each of those fields. The returned instance
+        is shared, so it should not be modified.
+
+        :param name: The name of the type
+        :param is_optional: Determines if the type is optional
+        """
+        key = (name, is_optional)
+        instance = cls._interned.get(key)
+        if instance is None:
+            instance = cls._interned[key] = cls(name, is_optional)
+
+        return instance
+
     def __repr__(self) -> str:
         """Pretty representation of class instance."""
         return f"<TypeComponent '{self.text()}'>"
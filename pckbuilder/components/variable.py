@@ -1,9 +1,20 @@
+from typing import Optional
+from .base import Component
 from .type import TypeComponent
+from ..utils import (
+    LINE_LENGTH,
+    collection_literal,
+    explode_brackets,
+    python_literal,
+    split_brackets,
+)
 
 
-class VariableComponent:
+class VariableComponent(Component):
     """Holds a single value."""
 
+    __slots__ = ("name", "description", "type", "value")
+
     def __init__(
         self, name: str, description: str, variable_type: TypeComponent, value=None
     ):
@@ -17,8 +28,19 @@ class VariableComponent:
         """Pretty representation of class instance."""
         return f"<VariableComponent '{self.text()}'>"
 
-    def text(self, show_type_hint=True, show_value=False) -> str:
-        """Convert our variable to text."""
+    def text(
+        self, show_type_hint=True, show_value=False, black_compatible=False, indent=0
+    ) -> str:
+        """Convert our variable to text.
+
+        :param black_compatible: Write the value the way black would, splitting it over
+        multiple lines when it doesn't fit on a single line
+        :param indent: The amount of spaces the text will be indented with, this determines
+        if the value fits on a single line
+        """
+        if black_compatible:
+            return self._black_text(show_type_hint, show_value, indent)
+
         text = f"{self.name}"
         if self.type and show_type_hint:
             text += f": {self.type.text()}"
@@ -31,6 +53,114 @@ class VariableComponent:
 
         return text
 
+    def _value_text(self) -> str:
+        """Returns the value the way black would write it on a single line."""
+        if isinstance(self.value, str):
+            return f'"{self.value}"'
+
+        return python_literal(self.value)
+
+    def _black_text(self, show_type_hint: bool, show_value: bool, indent: int) -> str:
+        """Convert our variable to text the way black would format it."""
+        text = f"{self.name}"
+        if self.type and show_type_hint:
+            text += f": {self.type.text()}"
+
+        if not show_value:
+            return text
+
+        collection = None
+        if not isinstance(self.value, str):
+            collection = collection_literal(self.value)
+
+        if collection:
+            opening_bracket, items, closing_bracket = collection
+            return split_brackets(
+                f"{text} = {opening_bracket}",
+                items,
+                closing_bracket,
+                indent,
+                explode=True,
+            )
+
+        value = self._value_text()
+        if indent + len(text) + len(value) + 3 <= LINE_LENGTH:
+            return f"{text} = {value}"
+
+        # Black wraps a value that is too long in parentheses, unless the assignment has no
+        # type hint and the value wouldn't fit on a line of its own either.
+        if (self.type and show_type_hint) or indent + 4 + len(value) <= LINE_LENGTH:
+            return f"{text} = (\n    {value}\n)"
+
+        return f"{text} = {value}"
+
+    def argument_text(self, show_value=False, indent=None) -> str:
+        """Convert our variable to a function argument the way black would write it.
+
+        :param show_value: Add the value as the default of the argument
+        :param indent: The amount of spaces the argument is indented with when it is on a
+        line of its own. The argument is then split over multiple lines when it doesn't fit
+        on the line, together with the comma following it
+        """
+        type_hint = self.type.text() if self.type else ""
+        if not show_value:
+            text = self.text(show_value=False)
+            if indent is None or indent + len(text) + 1 <= LINE_LENGTH:
+                return text
+
+            return self._split_type_hint(type_hint, "]") or text
+
+        if self.type:
+            text = f"{self.text()} = "
+        else:
+            text = f"{self.name}="
+
+        value = self._value_text()
+        if indent is None or indent + len(text) + len(value) + 1 <= LINE_LENGTH:
+            return f"{text}{value}"
+
+        # Black splits the brackets of the value first, unless the line up to them doesn't
+        # fit. Then it splits the brackets of the type hint, if there are any, and only
+        # splits the value as well when the line up to the type hint still doesn't fit.
+        collection = None
+        if not isinstance(self.value, str):
+            collection = collection_literal(self.value)
+
+        if collection:
+            opening_bracket, items, closing_bracket = collection
+            head_fits = indent + len(text) + len(opening_bracket) <= LINE_LENGTH
+            if head_fits or not type_hint.endswith("]"):
+                return split_brackets(
+                    f"{text}{opening_bracket}",
+                    items,
+                    closing_bracket,
+                    indent,
+                    explode=True,
+                    trailing_comma=True,
+                )
+
+        tail = f"] = {value}"
+        head_length = indent + len(self.name) + len(type_hint.split("[", 1)[0]) + 3
+        if collection and (
+            head_length > LINE_LENGTH or indent + len(tail) + 1 > LINE_LENGTH
+        ):
+            tail = explode_brackets(f"] = {opening_bracket}", items, closing_bracket)
+
+        return self._split_type_hint(type_hint, tail) or f"{text}{value}"
+
+    def _split_type_hint(self, type_hint: str, tail: str) -> Optional[str]:
+        """Returns the argument with the outer brackets of its type hint split.
+
+        None is returned when the type hint has no brackets.
+
+        :param tail: The closing bracket of the type hint and the text following it
+        """
+        if not type_hint.endswith("]"):
+            return None
+
+        outer_type, inner_type = type_hint[:-1].split("[", 1)
+        return f"{self.name}: {outer_type}[\n    {inner_type}\n{tail}"
+
     @property
     def docstring(self) -> str:
         """Generate the docstring of the VariableComponent."""
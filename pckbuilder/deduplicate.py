@@ -0,0 +1,459 @@
+import ast
+import builtins
+import textwrap
+from typing import Dict, List, Optional, Set, Tuple
+from .components.class_ import ClassComponent
+from .components.function import FunctionComponent
+from .components.module import ModuleComponent
+from .components.package import PackageComponent
+from .imports import (
+    ClassIndex,
+    collect_modules,
+    free_names,
+    from_import,
+    merge_imports,
+    relative_module,
+    walk_modules,
+)
+from .utils import hash_text
+
+Occurrence = Tuple[str, ModuleComponent, Optional[ClassComponent], FunctionComponent]
+
+
+def _definition_hash(function: FunctionComponent) -> Optional[str]:
+    """Returns the hash of the full text of a function, if its body can be rendered twice.
+
+    Callable and generator bodies are only rendered when the module is, so these functions
+    are never deduplicated.
+    """
+    if isinstance(function, str) or not isinstance(function.body, (str, list, tuple)):
+        return None
+
+    return hash_text(function.text())
+
+
+def _uses_private_names(method: FunctionComponent) -> bool:
+    """Returns whether a method uses private names, like self.__value.
+
+    Python mangles these with the name of the class defining the method, so the method
+    would use other attributes once it is moved into a mixin.
+    """
+    try:
+        tree = ast.parse(textwrap.dedent(method.text()))
+    except SyntaxError:
+        return True
+
+    for node in ast.walk(tree):
+        for name in (
+            getattr(node, "attr", None),
+            getattr(node, "id", None),
+            getattr(node, "name", None),
+            getattr(node, "arg", None),
+        ):
+            if (
+                isinstance(name, str)
+                and name.startswith("__")
+                and not name.endswith("__")
+            ):
+                return True
+
+    return False
+
+
+def _import_bindings(statement: str) -> Dict[str, Optional[str]]:
+    """Returns the names an import statement binds, with the import of each single name.
+
+    Names imported under a condition, like an if TYPE_CHECKING block, or imported
+    relatively are bound to None, as the shared module can't import them the same way.
+    """
+    try:
+        tree = ast.parse(textwrap.dedent(statement))
+    except SyntaxError:
+        return {}
+
+    bindings: Dict[str, Optional[str]] = {}
+    for statement_node in tree.body:
+        conditional = not isinstance(statement_node, (ast.Import, ast.ImportFrom))
+        for node in ast.walk(statement_node):
+            if isinstance(node, ast.Import):
+                for alias in node.names:
+                    name = alias.asname or alias.name.split(".")[0]
+                    alias_text = f" as {alias.asname}" if alias.asname else ""
+                    bindings[name] = f"import {alias.name}{alias_text}"
+            elif isinstance(node, ast.ImportFrom):
+                for alias in node.names:
+                    alias_text = f" as {alias.asname}" if alias.asname else ""
+                    bindings[alias.asname or alias.name] = (
+                        None
+                        if node.level
+                        else f"from {node.module} import {alias.name}{alias_text}"
+                    )
+            else:
+                continue
+
+            if conditional:
+                for alias in node.names:
+                    bindings[alias.asname or alias.name.split(".")[0]] = None
+
+    return bindings
+
+
+def _mixin_name(method_name: str, taken: Set[str]) -> str:
+    """Returns an unused name for the mixin holding the given method."""
+    base_name = "".join(part.title() for part in method_name.split("_") if part)
+    name = f"_{base_name}Mixin"
+    index = 2
+    while name in taken:
+        name = f"_{base_name}Mixin{index}"
+        index += 1
+
+    taken.add(name)
+    return name
+
+
+class _Deduplicator:
+    """Finds identical definitions in a package and moves them into shared definitions."""
+
+    def __init__(self, package: PackageComponent, min_count: int, shared_name: str):
+        """Initialise the pass for the given package."""
+        self.package = package
+        self.min_count = min_count
+        self.shared_path = f"{package.name}.{shared_name}"
+        self.shared = ModuleComponent(
+            shared_name, "Definitions shared by the modules of the package."
+        )
+        self.shared.classes = []
+        self.shared.functions = []
+        self.index = ClassIndex.from_package(package)
+        self.modules = dict((path, module) for module, path in walk_modules(package))
+        self.classes = {}
+        for module in self.modules.values():
+            for class_ in module.classes:
+                self.classes.setdefault(class_.name, class_)
+
+        self.class_hashes: Dict[int, Set[str]] = {}
+        self.taken_names = set(self.index.classes)
+        self.shared_names: Set[str] = set()
+        self.imports: Dict[str, List[str]] = {}
+        self.bindings: Dict[str, Optional[Dict[str, Optional[str]]]] = {}
+        self.shared_imports: Set[str] = set()
+        self.removed = 0
+
+    def _ancestors(self, class_: ClassComponent) -> List[ClassComponent]:
+        """Returns the generated classes the class inherits from, nearest first."""
+        ancestors = []
+        seen = {id(class_)}
+        pending = [class_]
+        while pending:
+            current = pending.pop(0)
+            bases = [current.base_class] if current.base_class else []
+            for name in (current.base_class_name or "").split(","):
+                base = self.classes.get(name.strip())
+                if base is not None and base is not current.base_class:
+                    bases.append(base)
+
+            for base in bases:
+                if id(base) not in seen:
+                    seen.add(id(base))
+                    ancestors.append(base)
+                    pending.append(base)
+
+        return ancestors
+
+    def _module_bindings(self, module_path: str) -> Optional[Dict[str, Optional[str]]]:
+        """Returns the names bound in a module, with the import binding each of them.
+
+        Names of the module's own variables, functions and classes, and names which can't
+        be imported the same way from the shared module, are bound to None. None is
+        returned for modules with star imports, as their names aren't known.
+        """
+        bindings = self.bindings.get(module_path)
+        if bindings is not None or module_path in self.bindings:
+            return bindings
+
+        module = self.modules[module_path]
+        package_root = self.package.name
+        bindings = {}
+        for statement in module.imports:
+            if "*" in statement:
+                self.bindings[module_path] = None
+                return None
+
+            for name, binding in _import_bindings(statement).items():
+                # Importing the package itself from the shared module creates a cycle
+                if binding is not None and (
+                    binding.split()[1].split(".")[0] == package_root
+                ):
+                    binding = None
+                bindings[name] = binding
+
+        for item in [*module.variables, *module.classes, *module.functions]:
+            if not isinstance(item, str):
+                bindings[item.name] = None
+
+        self.bindings[module_path] = bindings
+        return bindings
+
+    def _shared_imports(self, occurrences: List[Occurrence]) -> Optional[List[str]]:
+        """Returns the imports the shared module needs for the definitions, if they can move.
+
+        A definition can only move to the shared module when every name it uses from its
+        modules is a builtin or an absolute import, imported the same way by all of them.
+        Module variables, functions and classes, relative imports and imports of the
+        package itself would no longer be available.
+        """
+        _, _, class_, definition = occurrences[0]
+        names = free_names(definition)
+        if names is None:
+            return None
+
+        # Functions are defined in the shared module as well, so they can call themselves
+        if class_ is None:
+            names.discard(definition.name)
+
+        imports: Dict[str, str] = {}
+        for module_path in {occurrence[0] for occurrence in occurrences}:
+            bindings = self._module_bindings(module_path)
+            if bindings is None:
+                return None
+
+            for name in names:
+                if name in bindings:
+                    binding = bindings[name]
+                    if binding is None or imports.setdefault(name, binding) != binding:
+                        return None
+                elif self.index.module_path(name) or not hasattr(builtins, name):
+                    return None
+
+        return sorted(set(imports.values()))
+
+    def _use_shared(self, module_path: str, name: str):
+        """Import a name from the shared module into the given module."""
+        self.imports.setdefault(module_path, []).append(name)
+
+    def method_groups(self) -> Dict[str, List[Occurrence]]:
+        """Returns the occurrences of every method, keyed by the hash of its definition.
+
+        Methods which are also defined, identically, by one of the ancestors of their class
+        stay where they are, moving them could change which definition is used. Methods
+        using private names stay as well, as these are mangled with the name of the class.
+        """
+        groups: Dict[str, List[Occurrence]] = {}
+        for module_path, module in self.modules.items():
+            for class_ in module.classes:
+                hashes = self.class_hashes.setdefault(id(class_), set())
+                for method in class_.methods:
+                    method_hash = _definition_hash(method)
+                    if method_hash is None:
+                        continue
+
+                    hashes.add(method_hash)
+                    if not _uses_private_names(method):
+                        groups.setdefault(method_hash, []).append(
+                            (module_path, module, class_, method)
+                        )
+
+        for method_hash, occurrences in groups.items():
+            groups[method_hash] = [
+                occurrence
+                for occurrence in occurrences
+                if not any(
+                    method_hash in self.class_hashes.get(id(ancestor), ())
+                    for ancestor in self._ancestors(occurrence[2])  # type: ignore
+                )
+            ]
+
+        return groups
+
+    def deduplicate_methods(self):
+        """Move identical methods into mixins which the classes inherit from.
+
+        Mixins go to the module of the classes when they are all in a single module, or
+        to the shared module otherwise. Methods using names of their module other than
+        builtins and absolute imports can only be shared between classes of the same module.
+        """
+        local_mixins: Dict[str, List[ClassComponent]] = {}
+        class_mixins: Dict[int, Tuple[ClassComponent, List[str]]] = {}
+        for occurrences in self.method_groups().values():
+            if len(occurrences) < self.min_count:
+                continue
+
+            module_paths = {occurrence[0] for occurrence in occurrences}
+            shared_imports = None
+            if len(module_paths) > 1:
+                shared_imports = self._shared_imports(occurrences)
+
+            if shared_imports is not None:
+                self.shared_imports.update(shared_imports)
+                placements = [(None, occurrences)]
+            else:
+                placements = []
+                for module_path in sorted(module_paths):
+                    module_occurrences = [
+                        occurrence
+                        for occurrence in occurrences
+                        if occurrence[0] == module_path
+                    ]
+                    if len(module_occurrences) >= self.min_count:
+                        placements.append((module_path, module_occurrences))
+
+            for module_path, placed_occurrences in placements:
+                method = placed_occurrences[0][3]
+                mixin = ClassComponent(
+                    _mixin_name(method.name, self.taken_names),
+                    f"Shared implementation of the {method.name} method.",
+                    methods=[method],
+                    slots=True,
+                )
+                if module_path is None:
+                    self.shared.classes.append(mixin)
+                    self.shared_names.add(mixin.name)
+                else:
+                    local_mixins.setdefault(module_path, []).append(mixin)
+
+                for occurrence_path, _, class_, occurrence in placed_occurrences:
+                    class_.methods = [
+                        item for item in class_.methods if item is not occurrence
+                    ]
+                    class_mixins.setdefault(id(class_), (class_, []))[1].append(
+                        mixin.name
+                    )
+                    if module_path is None:
+                        self._use_shared(occurrence_path, mixin.name)
+
+                self.removed += len(placed_occurrences) - 1
+
+        # The moved methods overrode those of the original base class, so mixins come first
+        for class_, mixin_names in class_mixins.values():
+            if class_.base_class_name:
+                mixin_names.append(class_.base_class_name)
+            class_.base_class_name = ", ".join(mixin_names)
+
+        # Mixins are defined right before the first class inheriting from them. Their
+        # methods may use classes of the module defined before that class in annotations.
+        for module_path, mixins in local_mixins.items():
+            module = self.modules[module_path]
+            pending = {mixin.name: mixin for mixin in mixins}
+            classes = []
+            for class_ in module.classes:
+                _, mixin_names = class_mixins.get(id(class_), (class_, []))
+                for mixin_name in mixin_names:
+                    if mixin_name in pending:
+                        classes.append(pending.pop(mixin_name))
+
+                classes.append(class_)
+
+            module.classes = classes
+
+    def _shared_function_name(self, function: FunctionComponent) -> Optional[str]:
+        """Returns an unused name for a function in the shared module.
+
+        Different functions with the same name can be shared, all but the first are renamed
+        and imported under their original name. Renaming a function which refers to its own
+        name would change what it calls, so those are only shared under their own name.
+        """
+        name = function.name
+        index = 2
+        while name in self.shared_names:
+            name = f"{function.name}_{index}"
+            index += 1
+
+        if name != function.name and function.name in (free_names(function) or ()):
+            return None
+
+        self.shared_names.add(name)
+        return name
+
+    def deduplicate_functions(self):
+        """Move functions defined identically in several modules to the shared module."""
+        groups: Dict[str, List[Occurrence]] = {}
+        for module_path, module in self.modules.items():
+            for function in module.functions:
+                function_hash = _definition_hash(function)
+                if function_hash is not None:
+                    groups.setdefault(function_hash, []).append(
+                        (module_path, module, None, function)
+                    )
+
+        for occurrences in groups.values():
+            if len(occurrences) < self.min_count:
+                continue
+
+            shared_imports = self._shared_imports(occurrences)
+            if shared_imports is None:
+                continue
+
+            function = occurrences[0][3]
+            shared_name = self._shared_function_name(function)
+            if shared_name is None:
+                continue
+
+            self.shared_imports.update(shared_imports)
+
+            imported_name = function.name
+            if shared_name != imported_name:
+                imported_name = f"{shared_name} as {function.name}"
+                function.name = shared_name
+
+            self.shared.functions.append(function)
+            for module_path, module, _, occurrence in occurrences:
+                module.functions = [
+                    item for item in module.functions if item is not occurrence
+                ]
+                self._use_shared(module_path, imported_name)
+
+            self.removed += len(occurrences) - 1
+
+    def finish(self):
+        """Add the shared module to the package and import it where it is used."""
+        if not self.imports:
+            return
+
+        # The shared definitions are compiled with the same future features as before
+        shared_imports = list(self.shared_imports)
+        for module_path, names in self.imports.items():
+            module = self.modules[module_path]
+            shared_imports.extend(
+                statement
+                for statement in module.imports
+                if statement.lstrip().startswith("from __future__ ")
+            )
+            module.imports = merge_imports(
+                list(module.imports)
+                + [from_import(relative_module(module_path, self.shared_path), names)]
+            )
+
+        self.shared.imports = merge_imports(shared_imports)
+        self.package.modules = list(self.package.modules) + [self.shared]
+
+
+def deduplicate(
+    package: PackageComponent, min_count: int = 2, shared_module_name: str = "_shared"
+) -> int:
+    """Move identical methods and functions of a package into shared definitions.
+
+    Methods with an identical definition in several classes are moved into a mixin which
+    those classes inherit from. Functions with an identical definition in several modules
+    are moved to the shared module and imported from there. Definitions are compared by
+    the hash of their text, including their name, arguments, docstring and body.
+
+    The shared module is added to the package. Only definitions which use nothing but
+    builtins and absolute imports, imported the same way by all their modules, move there,
+    so they behave the same. The modules of the package are collected into lists, as the
+    whole package has to be compared.
+
+    Returns the amount of definitions that were removed.
+
+    :param package: The package to update, including its subpackages
+    :param min_count: The minimum amount of identical definitions to share them
+    :param shared_module_name: The name of the module for definitions shared between
+    modules, which is added to the root of the package
+    """
+    collect_modules(package)
+
+    deduplicator = _Deduplicator(package, min_count, shared_module_name)
+    deduplicator.deduplicate_methods()
+    deduplicator.deduplicate_functions()
+    deduplicator.finish()
+
+    return deduplicator.removed
@@ -0,0 +1,122 @@
+from typing import Callable, List, NamedTuple
+
+BUILD_STARTED = "build_started"
+BUILD_FINISHED = "build_finished"
+FOLDER_REMOVED = "folder_removed"
+FOLDER_CREATED = "folder_created"
+FILE_WRITTEN = "file_written"
+FILE_UNCHANGED = "file_unchanged"
+FILE_REMOVED = "file_removed"
+ARCHIVE_CREATED = "archive_created"
+BYTECODE_COMPILED = "bytecode_compiled"
+
+
+class BuildEvent(NamedTuple):
+    """A structured event emitted while building a package.
+
+    :param kind: The kind of event, one of the constants in this module
+    :param path: The file or folder the event is about
+    :param module: The name of the module the file was rendered from, if any
+    :param elapsed_seconds: The seconds since the build started
+    :param render_seconds: The seconds spent rendering the text of the file
+    :param format_seconds: The seconds spent formatting the file with black
+    :param write_seconds: The seconds spent writing the file
+    :param size: The size of the written file in bytes
+    :param line_count: The amount of lines of the written file
+    """
+
+    kind: str
+    path: str = ""
+    module: str = ""
+    elapsed_seconds: float = 0.0
+    render_seconds: float = 0.0
+    format_seconds: float = 0.0
+    write_seconds: float = 0.0
+    size: int = 0
+    line_count: int = 0
+
+    @property
+    def total_seconds(self) -> float:
+        """Returns the seconds spent on rendering, formatting and writing the file."""
+        return self.render_seconds + self.format_seconds + self.write_seconds
+
+
+EventSink = Callable[[BuildEvent], None]
+
+
+def print_event(event: BuildEvent):
+    """Event sink printing a line describing every event."""
+    if event.kind == FILE_WRITTEN:
+        print(
+            f"Wrote {event.path} ({event.size} bytes, {event.line_count} lines) in "
+            f"{event.total_seconds:.3f}s"
+        )
+    elif event.kind == BUILD_FINISHED:
+        print(f"Finished building '{event.path}' in {event.elapsed_seconds:.3f}s")
+    else:
+        print(f"{event.kind.replace('_', ' ').capitalize()}: {event.path}")
+
+
+class BuildReport:
+    """Event sink collecting the events of a build to report on them afterwards."""
+
+    def __init__(self):
+        """Initialise the report without any events."""
+        self.events: List[BuildEvent] = []
+
+    def __call__(self, event: BuildEvent):
+        """Collect the given event."""
+        self.events.append(event)
+
+    def __repr__(self) -> str:
+        """Pretty representation of class instance."""
+        return f"<BuildReport '{len(self.events)} events'>"
+
+    @property
+    def written_files(self) -> List[BuildEvent]:
+        """Returns the events of all written files."""
+        return [event for event in self.events if event.kind == FILE_WRITTEN]
+
+    def slowest_modules(self, count: int = 10) -> List[BuildEvent]:
+        """Returns the events of the modules that took longest to build.
+
+        :param count: The maximum amount of modules to return
+        """
+        modules = [event for event in self.written_files if event.module]
+        modules.sort(key=lambda event: event.total_seconds, reverse=True)
+
+        return modules[:count]
+
+    def summary(self, count: int = 10) -> str:
+        """Returns a summary of the build, listing the slowest modules.
+
+        :param count: The amount of slowest modules to list
+        """
+        written_files = self.written_files
+        unchanged_count = sum(
+            1 for event in self.events if event.kind == FILE_UNCHANGED
+        )
+        finished = [event for event in self.events if event.kind == BUILD_FINISHED]
+
+        lines = [
+            f"Files written: {len(written_files)}, unchanged: {unchanged_count}",
+            f"Bytes written: {sum(event.size for event in written_files)}",
+            f"Render time: {sum(event.render_seconds for event in written_files):.3f}s",
+            f"Format time: {sum(event.format_seconds for event in written_files):.3f}s",
+            f"Write time: {sum(event.write_seconds for event in written_files):.3f}s",
+        ]
+        if finished:
+            lines.append(f"Total time: {finished[-1].elapsed_seconds:.3f}s")
+
+        slowest_modules = self.slowest_modules(count)
+        if slowest_modules:
+            lines.append("Slowest modules:")
+            for event in slowest_modules:
+                lines.append(
+                    f"    {event.path}: {event.total_seconds:.3f}s "
+                    f"(render {event.render_seconds:.3f}s, "
+                    f"format {event.format_seconds:.3f}s, "
+                    f"write {event.write_seconds:.3f}s)"
+                )
+
+        return "\n".join(lines)
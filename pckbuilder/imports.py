@@ -0,0 +1,494 @@
+import ast
+import re
+import textwrap
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+from .components.function import FunctionComponent
+from .components.module import ModuleComponent
+from .components.package import PackageComponent
+from .components.type import BUILTIN_GENERIC_TYPES, TypeComponent
+from .utils import LINE_LENGTH, split_brackets
+
+TYPING_NAMES = BUILTIN_GENERIC_TYPES | {"Optional", "Any"}
+
+# Names used by generated code which are imported from the standard library
+STANDARD_LIBRARY_NAMES = {"dataclass": "dataclasses"}
+
+_NAME_PATTERN = re.compile(r"[A-Za-z_]\w*")
+
+
+class ClassIndex:
+    """Index of the classes defined across a package and its subpackages.
+
+    Maps every class name to the dotted path of the module defining it, so references
+    between modules resolve with a single dictionary lookup. When several modules define
+    a class with the same name, the first one found is used.
+    """
+
+    def __init__(self, classes: Optional[Dict[str, str]] = None):
+        """Initialise the index.
+
+        :param classes: Mapping of class name to the dotted path of its module
+        """
+        self.classes = classes or {}
+
+    def __repr__(self) -> str:
+        """Pretty representation of class instance."""
+        return f"<ClassIndex '{len(self.classes)} classes'>"
+
+    @classmethod
+    def from_package(cls, package: PackageComponent) -> "ClassIndex":
+        """Create the index of all classes in the package and its subpackages."""
+        index = cls()
+        for module, module_path in walk_modules(package):
+            for class_ in module.classes:
+                index.classes.setdefault(class_.name, module_path)
+
+        return index
+
+    def module_path(self, class_name: str) -> Optional[str]:
+        """Returns the dotted path of the module defining the class, if it is known."""
+        return self.classes.get(class_name)
+
+
+def walk_modules(
+    package: PackageComponent, package_path: Optional[str] = None
+) -> Iterator[Tuple[ModuleComponent, str]]:
+    """Yields all modules of the package and its subpackages with their dotted path."""
+    package_path = package_path or package.name
+    for module in package.modules:
+        yield module, f"{package_path}.{module.name}"
+
+    for subpackage in package.subpackages:
+        yield from walk_modules(subpackage, f"{package_path}.{subpackage.name}")
+
+
+def collect_modules(package: PackageComponent):
+    """Collect the modules of the package and its subpackages into lists.
+
+    Passes that look at the whole package go over the modules more than once, which a
+    generator of modules doesn't allow.
+    """
+    package.modules = list(package.modules)
+    for subpackage in package.subpackages:
+        collect_modules(subpackage)
+
+
+def _function_types(function: FunctionComponent) -> Iterator[TypeComponent]:
+    """Yields the types of the arguments and return value of a function."""
+    for argument in function.all_arguments:
+        if argument.type:
+            yield argument.type
+
+    if function.return_type:
+        yield function.return_type
+
+
+def runtime_names(module: ModuleComponent) -> Set[str]:
+    """Returns the names used by the base classes and decorators of a module.
+
+    These are evaluated when the module is imported, unlike type hints once annotations
+    are postponed with `from __future__ import annotations`.
+    """
+    names: Set[str] = set()
+    for class_ in module.classes:
+        if class_.base_class_name:
+            names.update(_NAME_PATTERN.findall(class_.base_class_name))
+
+        for decorator in class_.decorators:
+            names.add(_NAME_PATTERN.match(decorator, 1).group())
+
+    return names
+
+
+def annotation_names(module: ModuleComponent) -> Set[str]:
+    """Returns the names used in the type hints of a module."""
+    types: List[TypeComponent] = []
+    names: Set[str] = set()
+
+    types.extend(variable.type for variable in module.variables if variable.type)
+    for function in module.functions:
+        if not isinstance(function, str):
+            types.extend(_function_types(function))
+
+    for class_ in module.classes:
+        types.extend(
+            argument.type for argument in class_.class_arguments if argument.type
+        )
+        for method in class_.methods:
+            types.extend(_function_types(method))
+
+    # Identical types are usually interned, so most of them are only parsed once
+    for type_ in set(types):
+        names.update(_NAME_PATTERN.findall(type_.text()))
+
+    return names
+
+
+def referenced_names(module: ModuleComponent) -> Set[str]:
+    """Returns the names used in the type hints, decorators and base classes of a module."""
+    return runtime_names(module) | annotation_names(module)
+
+
+def free_names(
+    function: FunctionComponent, annotations: bool = True
+) -> Optional[Set[str]]:
+    """Returns the names a function uses from the module it is defined in.
+
+    These are the names its decorators, annotations, defaults and body read without
+    binding them itself. None is returned when the definition can't be parsed or declares
+    global names, as its behaviour then depends on the module it is in.
+
+    :param annotations: Include the names used by the annotations of the arguments and
+    return value, these aren't needed at runtime once annotations are postponed
+    """
+    try:
+        tree = ast.parse(textwrap.dedent(function.text()))
+    except SyntaxError:
+        return None
+
+    definition = tree.body[0]
+    if not annotations and isinstance(
+        definition, (ast.FunctionDef, ast.AsyncFunctionDef)
+    ):
+        definition.returns = None
+        for argument in ast.walk(definition.args):
+            if isinstance(argument, ast.arg):
+                argument.annotation = None
+    loaded: Set[str] = set()
+    bound: Set[str] = set()
+    for node in ast.walk(definition):
+        if isinstance(node, (ast.Global, ast.Nonlocal)):
+            return None
+        if isinstance(node, ast.Name):
+            if isinstance(node.ctx, ast.Load):
+                loaded.add(node.id)
+            else:
+                bound.add(node.id)
+        elif isinstance(node, ast.arg):
+            bound.add(node.arg)
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            for alias in node.names:
+                bound.add(alias.asname or alias.name.split(".")[0])
+        elif node is not definition and isinstance(
+            node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+        ):
+            bound.add(node.name)
+        elif isinstance(getattr(node, "name", None), str) and not isinstance(
+            node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+        ):
+            # Names bound by except clauses and match patterns
+            bound.add(node.name)
+
+    return loaded - bound
+
+
+def _is_import_block(text: str) -> bool:
+    """Returns whether raw text only holds import statements."""
+    try:
+        tree = ast.parse(textwrap.dedent(text))
+    except SyntaxError:
+        return False
+
+    return all(isinstance(node, (ast.Import, ast.ImportFrom)) for node in tree.body)
+
+
+def used_names(functions: list) -> Optional[Set[str]]:
+    """Returns the names the functions use from their module when they are called.
+
+    The annotations of their arguments and return values aren't part of these.
+
+    None is returned when a function is given as text or its body is only known once it
+    is rendered. Text holding only imports, like the imports placed after the definitions
+    of a module, uses nothing.
+    """
+    names: Set[str] = set()
+    for function in functions:
+        if isinstance(function, str) and _is_import_block(function):
+            continue
+
+        if isinstance(function, str) or not isinstance(
+            function.body, (str, list, tuple)
+        ):
+            return None
+
+        function_names = free_names(function, annotations=False)
+        if function_names is None:
+            return None
+
+        names.update(function_names)
+
+    return names
+
+
+def relative_module(module_path: str, target_path: str) -> str:
+    """Returns the relative import of the target module from the given module.
+
+    :param module_path: The dotted path of the importing module
+    :param target_path: The dotted path of the module to import from
+    """
+    package_parts = module_path.split(".")[:-1]
+    target_parts = target_path.split(".")
+
+    common = 0
+    while (
+        common < min(len(package_parts), len(target_parts) - 1)
+        and package_parts[common] == target_parts[common]
+    ):
+        common += 1
+
+    level = len(package_parts) - common + 1
+    return f"{'.' * level}{'.'.join(target_parts[common:])}"
+
+
+def from_import(module: str, names: List[str], indent: int = 0) -> str:
+    """Returns a from-import of the names, wrapped the way black would when it is too long.
+
+    :param module: The module to import from
+    :param names: The names to import
+    :param indent: The amount of spaces the import will be indented with
+    """
+    statement = f"from {module} import {', '.join(names)}"
+    if indent + len(statement) <= LINE_LENGTH:
+        return statement
+
+    # Black puts every name on its own line when an import doesn't fit on a single line
+    return split_brackets(f"from {module} import (", names, ")", indent, explode=True)
+
+
+def type_checking_block(statements: List[str]) -> str:
+    """Returns the import statements in an if TYPE_CHECKING block.
+
+    The block starts with an empty line, as black separates it from the imports before it.
+
+    :param statements: The import statements, formatted for an indent of 4 spaces
+    """
+    lines = ["", "if TYPE_CHECKING:"]
+    for statement in statements:
+        lines.extend(f"    {line}" for line in statement.splitlines())
+
+    return "\n".join(lines)
+
+
+def merge_imports(statements: List[str]) -> List[str]:
+    """Returns the import statements deduplicated, merged per module and sorted.
+
+    Names imported from the same module are combined into a single from-import. Imports
+    from __future__ come first, then plain imports, absolute and finally relative
+    from-imports. Statements which aren't a single import are kept as they are, after the
+    imports.
+    """
+    plain_imports: Set[str] = set()
+    from_imports: Dict[str, Set[str]] = {}
+    other_statements: List[str] = []
+
+    for statement in statements:
+        try:
+            tree = ast.parse(statement)
+        except SyntaxError:
+            tree = None
+
+        if tree is None or len(tree.body) != 1:
+            if statement not in other_statements:
+                other_statements.append(statement)
+            continue
+
+        node = tree.body[0]
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                plain_imports.add(
+                    f"{alias.name} as {alias.asname}" if alias.asname else alias.name
+                )
+        elif isinstance(node, ast.ImportFrom):
+            module = f"{'.' * node.level}{node.module or ''}"
+            names = from_imports.setdefault(module, set())
+            for alias in node.names:
+                names.add(
+                    f"{alias.name} as {alias.asname}" if alias.asname else alias.name
+                )
+        elif statement not in other_statements:
+            other_statements.append(statement)
+
+    # __future__ imports have to come before any other import
+    merged = []
+    future_names = from_imports.pop("__future__", None)
+    if future_names:
+        merged.append(from_import("__future__", sorted(future_names)))
+
+    merged.extend(f"import {name}" for name in sorted(plain_imports))
+    for module in sorted(from_imports, key=lambda module: (module[0] == ".", module)):
+        merged.append(from_import(module, sorted(from_imports[module])))
+
+    return merged + other_statements
+
+
+def _imported_names(
+    module: ModuleComponent, module_path: str, index: ClassIndex
+) -> Tuple[List[str], Dict[str, List[str]], Dict[str, List[str]], Dict[str, List[str]]]:
+    """Returns the names a module imports from typing and the names it imports per module.
+
+    The names of other modules are split in those imported directly, those imported after
+    the definitions and those imported in an if TYPE_CHECKING block.
+    """
+    local_names = {class_.name for class_ in module.classes}
+    eager_names = runtime_names(module)
+    hinted_names = annotation_names(module)
+    body_names = used_names(
+        [method for class_ in module.classes for method in class_.methods]
+        + list(module.functions)
+    )
+    typing_names = []
+    imports: Dict[str, List[str]] = {}
+    deferred_imports: Dict[str, List[str]] = {}
+    type_checking_imports: Dict[str, List[str]] = {}
+
+    for name in sorted(
+        (eager_names | hinted_names | (body_names or set())) - local_names
+    ):
+        if name in TYPING_NAMES or name in STANDARD_LIBRARY_NAMES:
+            if name not in eager_names and name not in hinted_names:
+                continue
+
+            if name in TYPING_NAMES:
+                typing_names.append(name)
+            else:
+                imports.setdefault(STANDARD_LIBRARY_NAMES[name], []).append(name)
+            continue
+
+        target_path = index.module_path(name)
+        if target_path is None or target_path == module_path:
+            continue
+
+        if name in eager_names:
+            imports.setdefault(target_path, []).append(name)
+        elif body_names is None or name in body_names:
+            # Bodies which can't be analysed might use any class of their type hints
+            deferred_imports.setdefault(target_path, []).append(name)
+        else:
+            type_checking_imports.setdefault(target_path, []).append(name)
+
+    return typing_names, imports, deferred_imports, type_checking_imports
+
+
+def module_imports(
+    module: ModuleComponent, module_path: str, index: ClassIndex
+) -> List[str]:
+    """Returns the imports needed by the type hints, decorators and base classes of a module.
+
+    Names from the typing module are imported from typing, the dataclass decorator from
+    dataclasses and classes of other modules in the package are imported relatively.
+    Builtins, classes defined in the module itself and unknown names don't need an import.
+
+    Models generated from schemas often refer to each other, importing them directly
+    would make the modules import each other in a cycle. Base classes and decorators are
+    used when the module is imported and are always imported directly. Classes of other
+    modules used by method and function bodies are imported after the definitions, see
+    deferred_imports. Classes which are only used in type hints are imported in an
+    if TYPE_CHECKING block. Annotations are postponed by a __future__ import when they
+    refer to either, or to classes of the module itself which might not be defined yet.
+
+    :param module: The module to compute the imports of
+    :param module_path: The dotted path of the module within the package
+    :param index: The index of all classes in the package
+    """
+    return _import_statements(
+        module, module_path, _imported_names(module, module_path, index)
+    )
+
+
+def _import_statements(
+    module: ModuleComponent, module_path: str, imported_names: tuple
+) -> List[str]:
+    """Returns the import statements of the names returned by _imported_names."""
+    typing_names, imports, deferred_imports, type_checking_imports = imported_names
+    hinted_names = annotation_names(module)
+
+    # Classes of the module itself aren't defined yet where their class or a class
+    # further down the module uses them in type hints
+    local_names = {class_.name for class_ in module.classes}
+    statements = []
+    if (
+        type_checking_imports
+        or not local_names.isdisjoint(hinted_names)
+        or any(
+            name in hinted_names
+            for names in deferred_imports.values()
+            for name in names
+        )
+    ):
+        statements.append("from __future__ import annotations")
+
+    if type_checking_imports:
+        typing_names = sorted(typing_names + ["TYPE_CHECKING"])
+
+    if typing_names:
+        statements.append(from_import("typing", typing_names))
+
+    for target_path, names in imports.items():
+        if target_path not in STANDARD_LIBRARY_NAMES.values():
+            target_path = relative_module(module_path, target_path)
+
+        statements.append(from_import(target_path, names))
+
+    if type_checking_imports:
+        statements.append(
+            type_checking_block(
+                [
+                    from_import(relative_module(module_path, target_path), names, 4)
+                    for target_path, names in type_checking_imports.items()
+                ]
+            )
+        )
+
+    return statements
+
+
+def deferred_imports(
+    module: ModuleComponent, module_path: str, index: ClassIndex
+) -> List[str]:
+    """Returns the imports of the classes of other modules used by the bodies of a module.
+
+    These go after the definitions of the module, so modules whose bodies use each other's
+    classes can import each other. The classes are only needed once the bodies run.
+
+    :param module: The module to compute the imports of
+    :param module_path: The dotted path of the module within the package
+    :param index: The index of all classes in the package
+    """
+    return _deferred_statements(
+        module_path, _imported_names(module, module_path, index)
+    )
+
+
+def _deferred_statements(module_path: str, imported_names: tuple) -> List[str]:
+    """Returns the imports after the definitions of the names returned by _imported_names."""
+    return [
+        from_import(relative_module(module_path, target_path), names)
+        for target_path, names in imported_names[2].items()
+    ]
+
+
+def resolve_imports(package: PackageComponent, index: Optional[ClassIndex] = None):
+    """Add the imports needed by the type hints of every module in the package.
+
+    The computed imports are merged with the imports already set on every module, so
+    every module ends up with a single deduplicated import block. Modules given as a
+    generator are collected into lists first.
+
+    :param package: The package whose modules to update, including its subpackages
+    :param index: The index of classes to resolve names with, built from the package
+    when not given
+    """
+    collect_modules(package)
+    index = index or ClassIndex.from_package(package)
+    for module, module_path in walk_modules(package):
+        imported_names = _imported_names(module, module_path, index)
+        statements = _deferred_statements(module_path, imported_names)
+        module.imports = merge_imports(
+            list(module.imports)
+            + _import_statements(module, module_path, imported_names)
+        )
+
+        # Placed after the definitions as raw text, once when resolving again
+        deferred_text = "\n".join(statements)
+        if statements and deferred_text not in module.functions:
+            module.functions = list(module.functions) + [deferred_text]
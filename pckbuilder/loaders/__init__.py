@@ -0,0 +1,4 @@
+"""Loaders turning schemas into components, one module at a time."""
+
+from .stream import iter_json_lines, iter_object_members
+from .json_schema import JsonSchemaLoader
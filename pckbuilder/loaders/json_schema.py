@@ -0,0 +1,164 @@
+import json
+import keyword
+import re
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+from ..components.class_ import ClassComponent
+from ..components.module import ModuleComponent
+from ..components.type import TypeComponent
+from ..components.variable import VariableComponent
+from ..imports import ClassIndex, merge_imports, module_imports
+from .stream import iter_json_lines, iter_object_members
+
+JSON_SCHEMA_TYPES = {
+    "string": "str",
+    "integer": "int",
+    "number": "float",
+    "boolean": "bool",
+    "array": "List",
+    "object": "dict",
+}
+
+
+def python_name(name: str) -> str:
+    """Returns the name with every character that isn't valid in a python name replaced.
+
+    Keywords like class or from get an underscore appended, soft keywords like match are
+    valid names.
+    """
+    name = re.sub(r"\W", "_", name)
+    if not name or name[0].isdigit():
+        name = f"_{name}"
+
+    if keyword.iskeyword(name):
+        name = f"{name}_"
+
+    return name
+
+
+class JsonSchemaLoader:
+    """Loads JSON schemas as ModuleComponents, one module at a time.
+
+    Every schema becomes a module with a class for each object in its definitions (or
+    $defs), and for the schema itself when it has a title and properties. Properties become
+    class arguments typed after their JSON type or the definition they refer to. Properties
+    that aren't required are optional. References to other schemas aren't imported, run
+    resolve_imports on the package to add those.
+
+    The modules are yielded as soon as their schema is parsed. Pass them straight to a
+    PackageComponent to build them without loading all schemas first.
+    """
+
+    def __init__(
+        self,
+        type_names: Optional[Dict[str, str]] = None,
+        intern_types: bool = True,
+    ):
+        """Initialise the loader.
+
+        :param type_names: Mapping of JSON schema type to python type name, extending
+        JSON_SCHEMA_TYPES
+        :param intern_types: Share a single TypeComponent between identical types
+        """
+        self.type_names = {**JSON_SCHEMA_TYPES, **(type_names or {})}
+        self.intern_types = intern_types
+
+    def __repr__(self) -> str:
+        """Pretty representation of class instance."""
+        return f"<JsonSchemaLoader '{len(self.type_names)} types'>"
+
+    def type_component(
+        self, schema: Dict[str, Any], is_optional: bool
+    ) -> TypeComponent:
+        """Returns the type of a property schema."""
+        if "$ref" in schema:
+            name = python_name(schema["$ref"].rsplit("/", 1)[-1])
+        else:
+            schema_type = schema.get("type", "object")
+            if isinstance(schema_type, list):
+                is_optional = is_optional or "null" in schema_type
+                schema_type = next(
+                    (item for item in schema_type if item != "null"), "object"
+                )
+            name = self.type_names.get(schema_type, "dict")
+
+        if self.intern_types:
+            return TypeComponent.intern(name, is_optional)
+
+        return TypeComponent(name, is_optional)
+
+    def class_component(self, name: str, schema: Dict[str, Any]) -> ClassComponent:
+        """Returns the class of an object schema."""
+        required = set(schema.get("required", []))
+        class_arguments = []
+        for property_name, property_schema in schema.get("properties", {}).items():
+            class_arguments.append(
+                VariableComponent(
+                    python_name(property_name),
+                    property_schema.get("description", ""),
+                    self.type_component(property_schema, property_name not in required),
+                )
+            )
+
+        return ClassComponent(
+            python_name(name),
+            schema.get("description") or schema.get("title") or name,
+            class_arguments,
+        )
+
+    def module(self, name: str, schema: Dict[str, Any]) -> ModuleComponent:
+        """Returns the module of a single schema.
+
+        :param name: The name of the schema, which becomes the module name
+        :param schema: The JSON schema document
+        """
+        classes: List[ClassComponent] = []
+        definitions = {**schema.get("definitions", {}), **schema.get("$defs", {})}
+        for definition_name, definition in definitions.items():
+            if definition.get("type", "object") == "object":
+                classes.append(self.class_component(definition_name, definition))
+
+        if "title" in schema and "properties" in schema:
+            classes.append(self.class_component(schema["title"], schema))
+
+        module = ModuleComponent(
+            python_name(name),
+            schema.get("description") or f"Models of the {name} schema.",
+            classes=classes,
+        )
+        # Definitions refer to themselves and to definitions further down the schema
+        module.imports = merge_imports(
+            ["from __future__ import annotations"]
+            + module_imports(module, f"{module.name}.{module.name}", ClassIndex())
+        )
+
+        return module
+
+    def iter_file(self, location: Path) -> Iterator[ModuleComponent]:
+        """Yields a module for every member of the JSON object in a file.
+
+        The file is parsed incrementally, so only the schema of a single module is held in
+        memory at a time.
+        """
+        with open(location, encoding="utf-8") as f:
+            for name, schema in iter_object_members(f):
+                yield self.module(name, schema)
+
+    def iter_json_lines(self, location: Path) -> Iterator[ModuleComponent]:
+        """Yields a module for every line of a JSON lines file.
+
+        Every line holds an object with the name of the module and its schema.
+        """
+        with open(location, encoding="utf-8") as f:
+            for item in iter_json_lines(f):
+                yield self.module(item["name"], item["schema"])
+
+    def iter_folder(
+        self, folder: Path, pattern: str = "*.json"
+    ) -> Iterator[ModuleComponent]:
+        """Yields a module for every schema file in a folder, named after the file."""
+        for location in sorted(Path(folder).glob(pattern)):
+            with open(location, encoding="utf-8") as f:
+                schema = json.load(f)
+
+            yield self.module(location.stem, schema)
@@ -0,0 +1,126 @@
+import json
+from typing import IO, Any, Iterator, Tuple
+
+_decoder = json.JSONDecoder()
+
+_WHITESPACE = " \t\n\r"
+
+# The characters that can follow a value in a JSON document
+_DELIMITERS = _WHITESPACE + ",:]}"
+
+
+class _Reader:
+    """Buffered reader decoding JSON values from a text stream as they are needed.
+
+    Only the part of the stream that hasn't been decoded yet is kept in memory.
+    """
+
+    def __init__(self, fp: IO[str], chunk_size: int):
+        """Initialise the reader.
+
+        :param fp: The text stream to read from
+        :param chunk_size: The amount of characters to read at once
+        """
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.position = 0
+        self.eof = False
+
+    def fill(self, size: int) -> bool:
+        """Read more of the stream into the buffer, returns if anything was read."""
+        if self.eof:
+            return False
+
+        chunk = self.fp.read(size)
+        if not chunk:
+            self.eof = True
+            return False
+
+        self.buffer = self.buffer[self.position :] + chunk
+        self.position = 0
+        return True
+
+    def next_character(self) -> str:
+        """Returns the next character which isn't whitespace, without consuming it."""
+        while True:
+            while self.position < len(self.buffer):
+                if self.buffer[self.position] not in _WHITESPACE:
+                    return self.buffer[self.position]
+                self.position += 1
+
+            if not self.fill(self.chunk_size):
+                return ""
+
+    def expect(self, characters: str) -> str:
+        """Consume the next character, which should be one of the given characters."""
+        character = self.next_character()
+        if not character or character not in characters:
+            raise json.JSONDecodeError(
+                f"Expecting one of {characters!r}", self.buffer, self.position
+            )
+
+        self.position += 1
+        return character
+
+    def decode(self) -> Any:
+        """Decode the next value from the stream.
+
+        A number might continue in the stream when it isn't followed by a delimiter yet, like
+        a number cut off at its decimal point, so values are only accepted when they are
+        followed by a delimiter or the end of the stream. The amount of characters read
+        grows with the size of the value, so large values aren't decoded over and over.
+        """
+        self.next_character()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.position)
+            except json.JSONDecodeError:
+                if not self.fill(max(self.chunk_size, len(self.buffer))):
+                    raise
+                continue
+
+            if end < len(self.buffer) and self.buffer[end] in _DELIMITERS:
+                self.position = end
+                return value
+
+            if not self.fill(self.chunk_size):
+                self.position = end
+                return value
+
+
+def iter_object_members(
+    fp: IO[str], chunk_size: int = 64 * 1024
+) -> Iterator[Tuple[str, Any]]:
+    """Yields the members of the JSON object in a stream one at a time.
+
+    Only a single member is decoded and held in memory at a time, so the stream can be
+    much larger than the available memory as long as every member fits.
+
+    :param fp: The text stream holding a JSON object
+    :param chunk_size: The amount of characters to read at once
+    """
+    reader = _Reader(fp, chunk_size)
+    reader.expect("{")
+    if reader.next_character() == "}":
+        return
+
+    while True:
+        key = reader.decode()
+        if not isinstance(key, str):
+            raise json.JSONDecodeError(
+                "Expecting property name", reader.buffer, reader.position
+            )
+
+        reader.expect(":")
+        yield key, reader.decode()
+
+        if reader.expect(",}") == "}":
+            return
+
+
+def iter_json_lines(fp: IO[str]) -> Iterator[Any]:
+    """Yields the value of every non empty line of a JSON lines stream."""
+    for line in fp:
+        if line.strip():
+            yield json.loads(line)
@@ -0,0 +1,92 @@
+import json
+from pathlib import Path
+from typing import Dict, Optional
+from .utils import hash_text
+
+
+class Manifest:
+    """Keeps track of the files written by a build.
+
+    For every file, relative to the build folder, it stores the hash of the unformatted input
+    and the hash of the content that was written. Incremental builds use this to skip files
+    whose components didn't change and to remove files that are no longer part of the package.
+    """
+
+    filename = ".pckbuilder-manifest.json"
+    version = 1
+
+    def __init__(self, entries: Optional[Dict[str, Dict[str, str]]] = None):
+        """Initialise the manifest.
+
+        :param entries: Mapping of relative file path to its input and output hash
+        """
+        self.entries = entries or {}
+
+    def __repr__(self) -> str:
+        """Pretty representation of class instance."""
+        return f"<Manifest '{len(self.entries)} files'>"
+
+    @classmethod
+    def load(cls, build_folder: Path) -> "Manifest":
+        """Load the manifest from the build folder.
+
+        An empty manifest is returned if there is no (readable) manifest.
+        """
+        try:
+            with open(Path(build_folder, cls.filename)) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls()
+
+        if not isinstance(data, dict) or data.get("version") != cls.version:
+            return cls()
+
+        return cls(data.get("files", {}))
+
+    def save(self, build_folder: Path):
+        """Write the manifest to the build folder."""
+        with open(Path(build_folder, self.filename), "w") as f:
+            json.dump(
+                {"version": self.version, "files": self.entries},
+                f,
+                indent=2,
+                sort_keys=True,
+            )
+
+    def record(self, relative_path: str, input_hash: str, output_hash: str):
+        """Record the hashes of a written file."""
+        self.entries[relative_path] = {"input": input_hash, "output": output_hash}
+
+    def input_hash(self, relative_path: str) -> Optional[str]:
+        """Returns the recorded input hash of a file, if any."""
+        entry = self.entries.get(relative_path)
+        return entry["input"] if entry else None
+
+    def is_current(
+        self, relative_path: str, input_hash: str, build_folder: Path
+    ) -> bool:
+        """Returns if the file on disk was written from the given input and left untouched since.
+
+        :param relative_path: The path of the file relative to the build folder
+        :param input_hash: The hash of the unformatted input of the file
+        :param build_folder: The folder the build is written to
+        """
+        entry = self.entries.get(relative_path)
+        if not entry or entry["input"] != input_hash:
+            return False
+
+        return self.matches_disk(relative_path, build_folder)
+
+    def matches_disk(self, relative_path: str, build_folder: Path) -> bool:
+        """Returns if the file on disk still has the recorded output hash."""
+        entry = self.entries.get(relative_path)
+        if not entry:
+            return False
+
+        try:
+            with open(Path(build_folder, relative_path)) as f:
+                content = f.read()
+        except OSError:
+            return False
+
+        return hash_text(content) == entry["output"]
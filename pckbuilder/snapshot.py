@@ -0,0 +1,598 @@
+import json
+import os
+import struct
+import zlib
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+from .components.class_ import ClassComponent
+from .components.function import FunctionComponent
+from .components.method import MethodComponent
+from .components.module import ModuleComponent
+from .components.package import PackageComponent
+from .components.type import TypeComponent
+from .components.variable import VariableComponent
+
+MAGIC = b"PCKSNAP\0"
+VERSION = 1
+
+# The header and the version follow the magic, the trailer points to the header
+_HEADER = struct.Struct("<8sI")
+_TRAILER = struct.Struct("<QQ")
+
+_FUNCTION = 0
+_METHOD = 1
+_RAW = 2
+
+
+def _restore(cls: type, *values, _set=object.__setattr__, **fields) -> Any:
+    """Create a component from its fields, without validating them again.
+
+    Values given by position are in the order of the fields of the component class.
+    """
+    component = cls.__new__(cls)
+    for name, value in zip(cls._field_names, values) if values else fields.items():
+        _set(component, name, value)
+
+    return component
+
+
+class _StringTable:
+    """Stores every distinct string once, referring to it by index."""
+
+    def __init__(self):
+        """Initialise an empty table."""
+        self.strings: List[str] = []
+        self.indexes: Dict[str, int] = {}
+
+    def __call__(self, value: Optional[str]) -> Optional[int]:
+        """Returns the index of a string in the table, adding it when needed."""
+        if value is None:
+            return None
+
+        index = self.indexes.get(value)
+        if index is None:
+            index = self.indexes[value] = len(self.strings)
+            self.strings.append(value)
+
+        return index
+
+
+class _Writer:
+    """Encodes a package into a snapshot file, one module at a time."""
+
+    def __init__(self, fp):
+        """Initialise the writer for the given binary file."""
+        self.fp = fp
+        self.offset = fp.tell()
+        self.types: Dict[Tuple[str, bool], int] = {}
+        self.modules: List[list] = []
+        self.module_paths = _StringTable()
+        # The stored classes by id, kept alive so their id isn't reused by another class
+        self.classes: Dict[int, Tuple[ClassComponent, int, int]] = {}
+        self.module_classes: Dict[int, Tuple[ClassComponent, int, int]] = {}
+        self.strings = _StringTable()
+        self.header_strings = _StringTable()
+
+    def type_index(self, type_: Optional[TypeComponent]) -> Optional[int]:
+        """Returns the index of a type in the type table, identical types are shared."""
+        if type_ is None:
+            return None
+
+        key = (type_.name, type_.is_optional)
+        index = self.types.get(key)
+        if index is None:
+            index = self.types[key] = len(self.types)
+
+        return index
+
+    def value(self, value: Any) -> Any:
+        """Encode a variable value, tagging the types JSON doesn't distinguish."""
+        if value is None or isinstance(value, (bool, int, float)):
+            return value
+
+        if isinstance(value, str):
+            return ["s", self.strings(value)]
+
+        if isinstance(value, list):
+            return ["l", [self.value(item) for item in value]]
+
+        if isinstance(value, tuple):
+            return ["t", [self.value(item) for item in value]]
+
+        if isinstance(value, (set, frozenset)):
+            return ["e", [self.value(item) for item in value]]
+
+        if isinstance(value, dict):
+            return [
+                "d",
+                [[self.value(key), self.value(item)] for key, item in value.items()],
+            ]
+
+        raise ValueError(f"Can't store a value of type {type(value).__name__}")
+
+    def variable(self, variable: VariableComponent) -> list:
+        """Encode a variable."""
+        return [
+            self.strings(variable.name),
+            self.strings(variable.description),
+            self.type_index(variable.type),
+            self.value(variable.value),
+        ]
+
+    def body(self, function: FunctionComponent) -> Union[int, List[Optional[int]]]:
+        """Encode the body of a function, rendering bodies given as a callable."""
+        body = function.body() if callable(function.body) else function.body
+        if isinstance(body, str):
+            return self.strings(body)  # type: ignore
+
+        if not isinstance(body, (list, tuple)):
+            raise ValueError(
+                f"Can't store the body of '{function.name}', a generator can only be "
+                "rendered once"
+            )
+
+        return [self.strings(line) for line in body]
+
+    def function(self, function: Union[str, FunctionComponent]) -> list:
+        """Encode a function or method."""
+        if isinstance(function, str):
+            return [_RAW, self.strings(function)]
+
+        encoded = [
+            _METHOD if isinstance(function, MethodComponent) else _FUNCTION,
+            self.strings(function.name),
+            self.strings(function.description),
+            self.body(function),
+            [self.variable(argument) for argument in function.arguments],
+            [self.variable(argument) for argument in function.keyword_arguments],
+            self.type_index(function.return_type),
+        ]
+        if isinstance(function, MethodComponent):
+            encoded.extend([function.is_class_method, function.is_static_method])
+
+        return encoded
+
+    def class_(
+        self, class_: Union[str, ClassComponent], module_number: int, position: int
+    ) -> Union[int, list]:
+        """Encode a class, classes given as text are stored as their string index.
+
+        A generated base class which is already stored is referred to by its module and
+        position, any other base class is stored along with the class.
+        """
+        if isinstance(class_, str):
+            return self.strings(class_)  # type: ignore
+
+        base_class = None
+        if class_.base_class is not None:
+            stored = self.module_classes.get(id(class_.base_class)) or self.classes.get(
+                id(class_.base_class)
+            )
+            if stored is not None:
+                base_class = list(stored[1:])
+            else:
+                base_class = self.class_(class_.base_class, module_number, -1)
+
+        if position >= 0:
+            self.module_classes[id(class_)] = (class_, module_number, position)
+
+        return [
+            self.strings(class_.name),
+            self.strings(class_.description),
+            [self.variable(argument) for argument in class_.class_arguments],
+            [self.function(method) for method in class_.methods],
+            self.strings(class_.base_class_name),
+            base_class,
+            class_.slots,
+            class_.dataclass,
+            class_.frozen,
+        ]
+
+    def module(
+        self, module: ModuleComponent, module_path: str, keep_classes: bool
+    ) -> int:
+        """Write a module as a compressed block of the file, returns its number.
+
+        :param keep_classes: Keep the classes of the module so later modules can refer to
+        them. Modules given as a generator only refer to classes of their own module, so
+        they don't have to stay in memory
+        """
+        self.strings = _StringTable()
+        self.module_classes = {}
+        number = len(self.modules)
+        encoded = [
+            self.strings(module.name),
+            self.strings(module.description),
+            [self.strings(statement) for statement in module.imports],
+            [self.variable(variable) for variable in module.variables],
+            [
+                self.class_(class_, number, position)
+                for position, class_ in enumerate(module.classes)
+            ],
+            [self.function(function) for function in module.functions],
+            self.strings(module.executable_body),
+        ]
+        block = _compress([self.strings.strings, encoded])
+        self.fp.write(block)
+        self.modules.append([self.module_paths(module_path), self.offset, len(block)])
+        self.offset += len(block)
+        if keep_classes:
+            self.classes.update(self.module_classes)
+
+        return number
+
+    def package(self, package: PackageComponent, package_path: str) -> list:
+        """Encode a package, writing its modules to the file as they go by."""
+        keep_classes = isinstance(package.modules, (list, tuple))
+        modules = [
+            self.module(module, f"{package_path}.{module.name}", keep_classes)
+            for module in package.modules
+        ]
+        subpackages = [
+            self.package(subpackage, f"{package_path}.{subpackage.name}")
+            for subpackage in package.subpackages
+        ]
+        # The strings of the packages are stored in the header
+        self.strings = self.header_strings
+        return [
+            self.strings(package.name),
+            self.strings(package.description),
+            self.strings(package.version),
+            self.strings(package.license),
+            [self.strings(classifier) for classifier in package.classifiers],
+            _optional_list(package.install_requirements, self.strings),
+            _optional_list(package.keywords, self.strings),
+            [self.strings(statement) for statement in package.imports],
+            self.strings(package.readme),
+            package.lazy_imports,
+            package.export_modules,
+            modules,
+            subpackages,
+        ]
+
+    def write(self, package: PackageComponent):
+        """Write the package and the header holding the tables and the module index."""
+        encoded_package = self.package(package, package.name)
+        types = [
+            [self.header_strings(name), is_optional] for name, is_optional in self.types
+        ]
+        header = _compress(
+            [
+                self.header_strings.strings,
+                types,
+                self.module_paths.strings,
+                self.modules,
+                encoded_package,
+            ]
+        )
+        self.fp.write(header)
+        self.fp.write(_TRAILER.pack(self.offset, len(header)))
+
+
+def _optional_list(values: Optional[Iterable[str]], strings) -> Optional[list]:
+    """Encode a list of strings which may be None."""
+    return None if values is None else [strings(value) for value in values]
+
+
+def _compress(data: Any) -> bytes:
+    """Returns the data as compressed compact JSON."""
+    return zlib.compress(
+        json.dumps(data, separators=(",", ":")).encode("utf-8"), level=6
+    )
+
+
+def _decompress(block: bytes) -> Any:
+    """Returns the data of a compressed JSON block."""
+    return json.loads(zlib.decompress(block))
+
+
+def save_snapshot(package: PackageComponent, location: Path):
+    """Store a package with all its modules and subpackages in a snapshot file.
+
+    Every module is stored as a separate compressed block with its own string table, so
+    it can be loaded on its own. Types are stored once in a table shared by all modules.
+    Modules given as a generator are consumed and written one at a time, their generated
+    base classes from other modules are then stored along with the classes using them.
+    Bodies given as a callable are stored as the text they render, generator bodies
+    can't be stored.
+
+    The file is written to a temporary file first, so an existing snapshot is only
+    replaced by a complete one.
+
+    :param package: The package to store
+    :param location: The file to write the snapshot to
+    """
+    location = Path(location)
+    temporary_location = location.with_name(f".{location.name}.{os.getpid()}.tmp")
+    try:
+        with open(temporary_location, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, VERSION))
+            _Writer(f).write(package)
+        os.replace(temporary_location, location)
+    except BaseException:
+        temporary_location.unlink(missing_ok=True)
+        raise
+
+
+class _SnapshotModules(Sequence):
+    """The modules of a package in a snapshot, loaded when they are first used."""
+
+    def __init__(self, snapshot: "Snapshot", numbers: List[int]):
+        """Initialise the modules with the numbers of their blocks in the snapshot."""
+        self.snapshot = snapshot
+        self.numbers = numbers
+
+    def __repr__(self) -> str:
+        """Pretty representation of class instance."""
+        return f"<SnapshotModules '{len(self.numbers)} modules'>"
+
+    def __len__(self) -> int:
+        """Returns the amount of modules."""
+        return len(self.numbers)
+
+    def __getitem__(self, index):
+        """Returns the module at the index, loading it when needed."""
+        if isinstance(index, slice):
+            return [self.snapshot.load_module(number) for number in self.numbers[index]]
+
+        return self.snapshot.load_module(self.numbers[index])
+
+
+class Snapshot:
+    """A package stored with save_snapshot, loading its modules as they are needed.
+
+    Opening a snapshot only reads the header with the packages, type table and module
+    index. Every module is read and decoded the first time it is used, after which the
+    same ModuleComponent is returned, so changes made to it are kept.
+    """
+
+    def __init__(self, location: Path):
+        """Open a snapshot file.
+
+        :param location: The snapshot file written by save_snapshot
+        """
+        self.location = Path(location)
+        with open(self.location, "rb") as f:
+            magic, version = _HEADER.unpack(f.read(_HEADER.size))
+            if magic != MAGIC:
+                raise ValueError(f"'{self.location}' is not a snapshot")
+            if version != VERSION:
+                raise ValueError(
+                    f"Unsupported snapshot version {version}, expected {VERSION}"
+                )
+
+            f.seek(-_TRAILER.size, os.SEEK_END)
+            offset, length = _TRAILER.unpack(f.read(_TRAILER.size))
+            f.seek(offset)
+            strings, types, module_paths, modules, self._package = _decompress(
+                f.read(length)
+            )
+
+        self._strings = strings
+        self.types = [
+            _restore(TypeComponent, strings[name], is_optional)
+            for name, is_optional in types
+        ]
+        self.module_paths: List[str] = [module_paths[path] for path, _, _ in modules]
+        self._blocks = [(offset, length) for _, offset, length in modules]
+        self._modules: Dict[int, ModuleComponent] = {}
+
+    def __repr__(self) -> str:
+        """Pretty representation of class instance."""
+        return f"<Snapshot '{self.location}'>"
+
+    def package(self) -> PackageComponent:
+        """Returns the stored package, with modules that are loaded as they are used."""
+        return self._decode_package(self._package)
+
+    def module(self, module_path: str) -> ModuleComponent:
+        """Returns a single module by its dotted path, like sdk.models.users."""
+        try:
+            number = self.module_paths.index(module_path)
+        except ValueError:
+            raise KeyError(module_path) from None
+
+        return self.load_module(number)
+
+    def load_module(self, number: int) -> ModuleComponent:
+        """Returns the module stored in the block with the given number."""
+        module = self._modules.get(number)
+        if module is None:
+            offset, length = self._blocks[number]
+            with open(self.location, "rb") as f:
+                f.seek(offset)
+                strings, encoded = _decompress(f.read(length))
+
+            module = self._modules[number] = _ModuleDecoder(
+                self, strings, number
+            ).module(encoded)
+
+        return module
+
+    def _decode_package(self, encoded: list) -> PackageComponent:
+        """Decode a package and its subpackages."""
+        strings = self._strings
+        (
+            name,
+            description,
+            version,
+            package_license,
+            classifiers,
+            install_requirements,
+            keywords,
+            imports,
+            readme,
+            lazy_imports,
+            export_modules,
+            modules,
+            subpackages,
+        ) = encoded
+        return _restore(
+            PackageComponent,
+            name=strings[name],
+            description=strings[description],
+            version=strings[version],
+            modules=_SnapshotModules(self, modules),
+            license=strings[package_license],
+            classifiers=[strings[classifier] for classifier in classifiers],
+            install_requirements=_decode_optional_list(install_requirements, strings),
+            keywords=_decode_optional_list(keywords, strings),
+            imports=[strings[statement] for statement in imports],
+            readme=None if readme is None else strings[readme],
+            subpackages=[self._decode_package(item) for item in subpackages],
+            lazy_imports=lazy_imports,
+            export_modules=export_modules,
+        )
+
+
+def _decode_optional_list(values: Optional[list], strings: List[str]):
+    """Decode a list of strings which may be None."""
+    return None if values is None else [strings[value] for value in values]
+
+
+class _ModuleDecoder:
+    """Decodes the block of a single module."""
+
+    def __init__(self, snapshot: Snapshot, strings: List[str], number: int):
+        """Initialise the decoder with the string table of the module."""
+        self.snapshot = snapshot
+        self.strings = strings
+        self.number = number
+        self.classes: List[Any] = []
+
+    def string(self, index: Optional[int]) -> Optional[str]:
+        """Returns the string at the index, if any."""
+        return None if index is None else self.strings[index]
+
+    def type(self, index: Optional[int]) -> Optional[TypeComponent]:
+        """Returns the shared type at the index of the type table, if any."""
+        return None if index is None else self.snapshot.types[index]
+
+    def value(self, value: Any) -> Any:
+        """Decode a variable value."""
+        if not isinstance(value, list):
+            return value
+
+        tag, items = value
+        if tag == "s":
+            return self.strings[items]
+        if tag == "l":
+            return [self.value(item) for item in items]
+        if tag == "t":
+            return tuple(self.value(item) for item in items)
+        if tag == "e":
+            return {self.value(item) for item in items}
+
+        return {self.value(key): self.value(item) for key, item in items}
+
+    def variable(self, encoded: list) -> VariableComponent:
+        """Decode a variable."""
+        name, description, type_index, value = encoded
+        strings = self.strings
+        return _restore(
+            VariableComponent,
+            strings[name],
+            strings[description],
+            None if type_index is None else self.snapshot.types[type_index],
+            value if value.__class__ is not list else self.value(value),
+        )
+
+    def function(self, encoded: list) -> Union[str, FunctionComponent]:
+        """Decode a function or method."""
+        if encoded[0] == _RAW:
+            return self.strings[encoded[1]]
+
+        strings = self.strings
+        kind, name, description, body, arguments, keyword_arguments, return_type = (
+            encoded[:7]
+        )
+        return _restore(
+            MethodComponent if kind == _METHOD else FunctionComponent,
+            strings[name],
+            strings[description],
+            [self.variable(argument) for argument in arguments],
+            [self.variable(argument) for argument in keyword_arguments],
+            (
+                [strings[line] for line in body]
+                if isinstance(body, list)
+                else strings[body]
+            ),
+            self.type(return_type),
+            *encoded[7:],
+        )
+
+    def class_(self, encoded: Union[int, list]) -> Union[str, ClassComponent]:
+        """Decode a class, resolving its base class."""
+        if isinstance(encoded, int):
+            return self.strings[encoded]
+
+        (
+            name,
+            description,
+            class_arguments,
+            methods,
+            base_class_name,
+            base_class,
+            slots,
+            dataclass,
+            frozen,
+        ) = encoded
+        if base_class is not None:
+            if len(base_class) == 2:
+                module_number, position = base_class
+                if module_number == self.number:
+                    base_class = self.classes[position]
+                else:
+                    module = self.snapshot.load_module(module_number)
+                    base_class = module.classes[position]
+            else:
+                base_class = self.class_(base_class)
+
+        return _restore(
+            ClassComponent,
+            self.strings[name],
+            self.strings[description],
+            [self.variable(argument) for argument in class_arguments],
+            [self.function(method) for method in methods],
+            self.string(base_class_name),
+            base_class,
+            slots,
+            dataclass,
+            frozen,
+        )
+
+    def module(self, encoded: list) -> ModuleComponent:
+        """Decode a module."""
+        (
+            name,
+            description,
+            imports,
+            variables,
+            classes,
+            functions,
+            executable_body,
+        ) = encoded
+        for class_ in classes:
+            self.classes.append(self.class_(class_))
+
+        return _restore(
+            ModuleComponent,
+            self.strings[name],
+            self.strings[description],
+            [self.strings[statement] for statement in imports],
+            [self.variable(variable) for variable in variables],
+            self.classes,
+            [self.function(function) for function in functions],
+            self.string(executable_body),
+        )
+
+
+def load_snapshot(location: Path) -> PackageComponent:
+    """Returns the package stored in a snapshot file.
+
+    The modules are read from the file as they are used, see Snapshot.
+
+    :param location: The snapshot file written by save_snapshot
+    """
+    return Snapshot(location).package()
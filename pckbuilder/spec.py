@@ -0,0 +1,345 @@
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterator, NamedTuple, Optional, Union
+from .cache import FormatCache
+from .components.class_ import ClassComponent
+from .components.function import FunctionComponent
+from .components.method import MethodComponent
+from .components.module import ModuleComponent
+from .components.package import PackageComponent
+from .components.type import TypeComponent
+from .components.variable import VariableComponent
+from .loaders.json_schema import JsonSchemaLoader
+from .snapshot import MAGIC, load_snapshot
+
+# The build arguments a spec can set, with the type of their value
+BUILD_OPTIONS = {
+    "build_folder": str,
+    "create_pyproject_file": bool,
+    "create_setup_file": bool,
+    "create_readme_file": bool,
+    "jobs": (int, type(None)),
+    "incremental": bool,
+    "format_cache": (str, bool),
+    "format_with_black": bool,
+    "black_compatible": bool,
+    "verify_sample": int,
+    "write_queue_size": int,
+    "target": str,
+    "compute_imports": bool,
+    "max_module_classes": int,
+    "compile_bytecode": bool,
+    "optimization_levels": list,
+    "deduplicate_definitions": bool,
+    "validate": bool,
+}
+
+_PACKAGE_FIELDS = {
+    "name",
+    "description",
+    "version",
+    "modules",
+    "license",
+    "classifiers",
+    "install_requirements",
+    "keywords",
+    "imports",
+    "readme",
+    "subpackages",
+    "lazy_imports",
+    "export_modules",
+}
+_MODULE_FIELDS = {
+    "name",
+    "description",
+    "imports",
+    "variables",
+    "classes",
+    "functions",
+    "executable_body",
+}
+_SCHEMA_FIELDS = {"schemas", "pattern", "type_names"}
+_CLASS_FIELDS = {
+    "name",
+    "description",
+    "arguments",
+    "methods",
+    "base_class",
+    "base_class_name",
+    "slots",
+    "dataclass",
+    "frozen",
+}
+_FUNCTION_FIELDS = {
+    "name",
+    "description",
+    "body",
+    "arguments",
+    "keyword_arguments",
+    "return_type",
+}
+_METHOD_FIELDS = _FUNCTION_FIELDS | {"class_method", "static_method"}
+_VARIABLE_FIELDS = {"name", "description", "type", "value"}
+_TYPE_FIELDS = {"name", "optional"}
+
+
+class BuildSpec(NamedTuple):
+    """A package with the arguments to build it, as declared in a spec file.
+
+    :param package: The package to build
+    :param options: The keyword arguments for build, with paths resolved against the
+    folder of the spec file
+    """
+
+    package: PackageComponent
+    options: Dict[str, Any]
+
+
+def _as_tuple(types) -> tuple:
+    """Returns a type or tuple of types as a tuple."""
+    return types if isinstance(types, tuple) else (types,)
+
+
+def _check_fields(data: Any, kind: str, fields: set, required=("name",)) -> dict:
+    """Returns the data of a component after checking it only holds the given fields."""
+    if not isinstance(data, dict):
+        raise ValueError(f"Expected an object for {kind}, got {data!r}")
+
+    name = data.get("name", "")
+    unknown = sorted(set(data) - fields)
+    if unknown:
+        raise ValueError(f"Unknown field(s) {', '.join(unknown)} in {kind} '{name}'")
+
+    missing = [field for field in required if field not in data]
+    if missing:
+        raise ValueError(f"Missing field(s) {', '.join(missing)} in {kind} '{name}'")
+
+    return data
+
+
+class _SpecReader:
+    """Turns the data of a spec into components."""
+
+    def __init__(self, folder: Path):
+        """Initialise the reader.
+
+        :param folder: The folder relative paths in the spec are resolved against
+        """
+        self.folder = folder
+        self.classes: Dict[str, ClassComponent] = {}
+
+    def path(self, value: str) -> Path:
+        """Returns a path of the spec, relative to the folder of the spec file."""
+        return self.folder / Path(value).expanduser()
+
+    def type(self, data: Union[None, str, dict]) -> Optional[TypeComponent]:
+        """Returns the shared type of a type name or object."""
+        if data is None:
+            return None
+
+        if isinstance(data, str):
+            return TypeComponent.intern(data)
+
+        _check_fields(data, "type", _TYPE_FIELDS)
+        return TypeComponent.intern(data["name"], bool(data.get("optional", False)))
+
+    def variable(self, data: dict) -> VariableComponent:
+        """Returns the variable or argument of an object."""
+        _check_fields(data, "variable", _VARIABLE_FIELDS)
+        return VariableComponent(
+            data["name"],
+            data.get("description", ""),
+            self.type(data.get("type")),
+            value=data.get("value"),
+        )
+
+    def function(self, data: dict, method: bool = False) -> FunctionComponent:
+        """Returns the function or method of an object."""
+        if method:
+            _check_fields(data, "method", _METHOD_FIELDS, ("name", "body"))
+        else:
+            _check_fields(data, "function", _FUNCTION_FIELDS, ("name", "body"))
+
+        fields = dict(
+            arguments=[self.variable(item) for item in data.get("arguments", [])],
+            keyword_arguments=[
+                self.variable(item) for item in data.get("keyword_arguments", [])
+            ],
+            return_type=self.type(data.get("return_type")),
+        )
+        if method:
+            return MethodComponent(
+                data["name"],
+                data.get("description", ""),
+                data["body"],
+                is_class_method=bool(data.get("class_method", False)),
+                is_static_method=bool(data.get("static_method", False)),
+                **fields,
+            )
+
+        return FunctionComponent(
+            data["name"], data.get("description", ""), data["body"], **fields
+        )
+
+    def class_(self, data: dict) -> ClassComponent:
+        """Returns the class of an object.
+
+        The base_class refers to a class defined earlier in the spec, by its name.
+        """
+        _check_fields(data, "class", _CLASS_FIELDS)
+        base_class = None
+        if data.get("base_class"):
+            base_class = self.classes.get(data["base_class"])
+            if base_class is None:
+                raise ValueError(
+                    f"Base class '{data['base_class']}' of class '{data['name']}' "
+                    "isn't defined earlier in the spec"
+                )
+
+        class_ = ClassComponent(
+            data["name"],
+            data.get("description", ""),
+            [self.variable(item) for item in data.get("arguments", [])],
+            [self.function(item, method=True) for item in data.get("methods", [])],
+            base_class_name=data.get("base_class_name"),
+            base_class=base_class,
+            slots=bool(data.get("slots", False)),
+            dataclass=bool(data.get("dataclass", False)),
+            frozen=bool(data.get("frozen", False)),
+        )
+        self.classes[class_.name] = class_
+        return class_
+
+    def module(self, data: dict) -> ModuleComponent:
+        """Returns the module of an object."""
+        _check_fields(data, "module", _MODULE_FIELDS)
+        return ModuleComponent(
+            data["name"],
+            data.get("description", ""),
+            data.get("imports", []),
+            [self.variable(item) for item in data.get("variables", [])],
+            [self.class_(item) for item in data.get("classes", [])],
+            [self.function(item) for item in data.get("functions", [])],
+            data.get("executable_body"),
+        )
+
+    def schema_modules(self, data: dict) -> Iterator[ModuleComponent]:
+        """Yields the modules of JSON schemas, see JsonSchemaLoader.
+
+        A folder yields a module for every file matching the pattern, a .jsonl file one for
+        every line and any other file one for every member of its JSON object.
+        """
+        _check_fields(data, "schemas", _SCHEMA_FIELDS, ("schemas",))
+        loader = JsonSchemaLoader(data.get("type_names"))
+        location = self.path(data["schemas"])
+        if location.is_dir():
+            return loader.iter_folder(location, data.get("pattern", "*.json"))
+        if location.suffix == ".jsonl":
+            return loader.iter_json_lines(location)
+
+        return loader.iter_file(location)
+
+    def modules(self, items: list) -> Iterator[ModuleComponent]:
+        """Yields the modules of a package as the build consumes them."""
+        for data in items:
+            if isinstance(data, dict) and "schemas" in data:
+                yield from self.schema_modules(data)
+            else:
+                yield self.module(data)
+
+    def package(self, data: dict) -> PackageComponent:
+        """Returns the package of an object, including its subpackages.
+
+        Modules are only created when the build consumes them, so the modules of large
+        schemas are never all in memory at the same time.
+        """
+        _check_fields(data, "package", _PACKAGE_FIELDS, ("name", "version"))
+        readme = data.get("readme")
+        if readme is not None:
+            readme = self.path(readme).read_text(encoding="utf-8")
+
+        return PackageComponent(
+            data["name"],
+            data.get("description", ""),
+            data["version"],
+            modules=self.modules(data.get("modules", [])),
+            package_license=data.get("license", "MIT"),
+            classifiers=data.get("classifiers"),
+            install_requirements=data.get("install_requirements"),
+            keywords=data.get("keywords"),
+            imports=data.get("imports"),
+            readme=readme,
+            subpackages=[self.package(item) for item in data.get("subpackages", [])],
+            lazy_imports=bool(data.get("lazy_imports", False)),
+            export_modules=bool(data.get("export_modules", False)),
+        )
+
+    def options(self, data: dict) -> Dict[str, Any]:
+        """Returns the build arguments of the build section of a spec."""
+        if not isinstance(data, dict):
+            raise ValueError(f"Expected an object for the build options, got {data!r}")
+
+        options: Dict[str, Any] = {}
+        for name, value in data.items():
+            if name not in BUILD_OPTIONS:
+                raise ValueError(f"Unknown build option '{name}'")
+            types = BUILD_OPTIONS[name]
+            if not isinstance(value, types) or (
+                isinstance(value, bool) and bool not in _as_tuple(types)
+            ):
+                raise ValueError(f"Invalid value {value!r} for build option '{name}'")
+
+            if name == "build_folder":
+                value = self.path(value)
+            elif name == "format_cache":
+                if value is False:
+                    continue
+                value = FormatCache(None if value is True else self.path(value))
+            elif name == "optimization_levels":
+                value = tuple(value)
+
+            options[name] = value
+
+        return options
+
+
+def parse_spec(data: Dict[str, Any], folder: Path = Path(".")) -> BuildSpec:
+    """Returns the package and build arguments declared by the data of a spec.
+
+    The spec holds the package under "package" and the keyword arguments for build under
+    "build". Components are given as objects with the fields of their constructor, types
+    as their name or an object with name and optional. Modules of JSON schemas are given
+    as an object with the schemas file or folder, which is loaded with JsonSchemaLoader.
+
+    :param data: The data of the spec
+    :param folder: The folder relative paths in the spec are resolved against
+    """
+    _check_fields(data, "spec", {"package", "build"}, ("package",))
+    reader = _SpecReader(Path(folder))
+    return BuildSpec(
+        reader.package(data["package"]), reader.options(data.get("build", {}))
+    )
+
+
+def load_spec(location: Path) -> BuildSpec:
+    """Returns the package and build arguments declared in a spec file.
+
+    The spec file is either a JSON file, see parse_spec, or a snapshot written by
+    save_snapshot, which holds no build arguments.
+
+    :param location: The spec file. Relative paths in it are resolved against its folder
+    """
+    location = Path(location)
+    with open(location, "rb") as f:
+        is_snapshot = f.read(len(MAGIC)) == MAGIC
+
+    if is_snapshot:
+        return BuildSpec(load_snapshot(location), {})
+
+    with open(location, encoding="utf-8") as f:
+        try:
+            data = json.load(f)
+        except json.JSONDecodeError as error:
+            raise ValueError(f"'{location}' is not a valid spec: {error}") from None
+
+    return parse_spec(data, location.parent)
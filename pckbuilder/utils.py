@@ -1,27 +1,193 @@
 import black
+import hashlib
 from pathlib import Path
-from typing import Iterable
+from typing import Iterable, List, Optional, Tuple
 
+LINE_LENGTH = 88
 
-def write_file(content: str, location: Path, overwrite=True, format_with_black=True):
+
+def format_text(content: str, format_cache=None) -> str:
+    """Format the given python source with black.
+
+    :param content: The python source code to format
+    :param format_cache: Optional FormatCache to look up and store the formatted result
+    """
+    if format_cache is not None:
+        return format_cache.format(content)
+
+    return black.format_str(
+        content,
+        mode=black.Mode(),  # type: ignore
+    )
+
+
+def text_hasher(*parts: str):
+    """Returns a sha256 hash object primed with the given pieces of text.
+
+    Every piece is followed by a null byte, so the remaining text can be fed to the
+    hash object in chunks as it is produced.
+
+    :param parts: The pieces of text to start the hash with
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+
+    return digest
+
+
+def hash_text(*parts: str) -> str:
+    """Returns the sha256 hex digest of the given pieces of text.
+
+    :param parts: The pieces of text to hash, these are separated by a null byte
+    """
+    digest = text_hasher(*parts[:-1])
+    if parts:
+        digest.update(parts[-1].encode("utf-8"))
+
+    return digest.hexdigest()
+
+
+def split_brackets(
+    head: str,
+    items: List[str],
+    tail: str,
+    indent: int = 0,
+    explode: bool = False,
+    trailing_comma: bool = False,
+) -> str:
+    """Join items between brackets, splitting them over multiple lines like black would.
+
+    The items are kept on one line with the head and tail if that fits within the line
+    length. Otherwise they are moved to a separate line, or when that doesn't fit either
+    or explode is set, to a line per item with a trailing comma. Lines are indented
+    relative to the head, including the lines of items spanning multiple lines.
+
+    :param head: The text up to and including the opening bracket
+    :param items: The comma separated items between the brackets
+    :param tail: The text starting with the closing bracket
+    :param indent: The amount of spaces the result will be indented with
+    :param explode: Always put every item on its own line when splitting. Items already
+    ending with a comma, like the item of a one-tuple, don't get a second one
+    :param trailing_comma: The result is followed by a comma, like an argument on a line of
+    its own, which has to fit on the line as well
+    """
+    body = ", ".join(items)
+    width = indent + len(head) + len(body) + len(tail) + trailing_comma
+    if not items or width <= LINE_LENGTH:
+        return f"{head}{body}{tail}"
+
+    if not explode and indent + 4 + len(body) <= LINE_LENGTH:
+        return f"{head}\n    {body}\n{tail}"
+
+    return explode_brackets(head, items, tail)
+
+
+def explode_brackets(head: str, items: List[str], tail: str) -> str:
+    """Join items between brackets, each on a line of its own with a trailing comma.
+
+    :param head: The text up to and including the opening bracket
+    :param items: The items between the brackets, which may span multiple lines
+    :param tail: The text starting with the closing bracket
+    """
+    lines = []
+    for item in items:
+        if not item.endswith(","):
+            item = f"{item},"
+
+        lines.extend(f"    {line}\n" for line in item.splitlines())
+
+    return f"{head}\n{''.join(lines)}{tail}"
+
+
+def string_literal(value: str) -> str:
+    """Returns the source code of a string the way black would quote it."""
+    literal = repr(value)
+    if literal[0] == '"':
+        return literal
+
+    # Black prefers double quotes unless they need more escaping than single quotes
+    body = literal[1:-1].replace("\\'", "'")
+    if '"' in value:
+        if value.count('"') > value.count("'"):
+            return literal
+        body = body.replace('"', '\\"')
+
+    return f'"{body}"'
+
+
+def collection_literal(value) -> Optional[Tuple[str, List[str], str]]:
+    """Returns the brackets and items of a list, tuple, set or dict value.
+
+    None is returned for any other, or an empty, value.
+    """
+    if not value:
+        return None
+
+    if isinstance(value, list):
+        return "[", [python_literal(item) for item in value], "]"
+
+    if isinstance(value, tuple):
+        items = [python_literal(item) for item in value]
+        if len(items) == 1:
+            items = [f"{items[0]},"]
+
+        return "(", items, ")"
+
+    if isinstance(value, set):
+        return "{", [python_literal(item) for item in value], "}"
+
+    if isinstance(value, dict):
+        items = [
+            f"{python_literal(key)}: {python_literal(item)}"
+            for key, item in value.items()
+        ]
+        return "{", items, "}"
+
+    return None
+
+
+def python_literal(value) -> str:
+    """Returns the source code of a value on a single line, the way black would write it."""
+    if isinstance(value, str):
+        return string_literal(value)
+
+    collection = collection_literal(value)
+    if collection is None:
+        return str(value)
+
+    opening_bracket, items, closing_bracket = collection
+    return f"{opening_bracket}{', '.join(items)}{closing_bracket}"
+
+
+def write_file(
+    content: str,
+    location: Path,
+    overwrite=True,
+    format_with_black=True,
+    format_cache=None,
+) -> str:
     """Write content to file.
 
+    Returns the content as it was written to the file.
+
     :param location: The full path to the file to write
     :param overwrite: determines if we allow overwriting existing files
     :param format_with_black: format the text with black formatter
+    :param format_cache: Optional FormatCache used when formatting with black
     """
     if overwrite is False and location.exists:
         raise IOError(f"Location {location} already exists")
 
     if format_with_black is True:
-        content = black.format_str(
-            content,
-            mode=black.Mode(),  # type: ignore
-        )
+        content = format_text(content, format_cache)
 
     with open(location, "w") as f:
         f.write(content)
 
+    return content
+
 
 class Text:
     """Class representing text.
@@ -29,9 +195,31 @@ class Text:
     It offers helpers to easily compose a text with with proper indentation and layout.
     """
 
-    def __init__(self):
-        """Initialise TextFile with empty text."""
-        self._text = ""
+    def __init__(self, black_compatible: bool = False):
+        """Initialise TextFile with empty text.
+
+        The text is kept as a list of chunks which only gets joined when the string
+        property is read. This keeps composing large texts linear in time.
+
+        :param black_compatible: Compose the text the way black would format it. Empty lines
+        aren't indented and docstrings are normalised
+        """
+        self._chunks: List[str] = []
+        self.black_compatible = black_compatible
+
+    def _strip_trailing_newlines(self):
+        """Remove trailing newlines from the end of the text.
+
+        Chunks consisting only of newlines are dropped entirely so stripping can
+        continue into the previous chunk.
+        """
+        chunks = self._chunks
+        while chunks:
+            stripped = chunks[-1].rstrip("\n")
+            if stripped:
+                chunks[-1] = stripped
+                return
+            chunks.pop()
 
     def _indent(self, text: str, indent: int) -> str:
         """Indents the given text with spaces.
@@ -40,6 +228,14 @@ class Text:
         :param indent: the amount of spaces to indent the text with.
         """
         spaces = indent * " "
+        if self.black_compatible:
+            return "\n".join(
+                [
+                    f"{spaces}{line}" if line.strip() else ""
+                    for line in text.splitlines()
+                ]
+            )
+
         text = "\n".join([f"{spaces}{line}" for line in text.splitlines()])
         return text
 
@@ -55,7 +251,8 @@ class Text:
             if indent:
                 text = self._indent(text, indent)
 
-            self._text += text
+            if text:
+                self._chunks.append(text)
         else:
             for item in text:
                 if isinstance(item, str):
@@ -63,8 +260,9 @@ class Text:
                 else:
                     self.add(item.text(), indent, newlines=1)  # type: ignore
 
-        self._text = self._text.rstrip("\n")
-        self._text += newlines * "\n"
+        self._strip_trailing_newlines()
+        if newlines > 0:
+            self._chunks.append(newlines * "\n")
 
     def add_shebang(self):
         """Adds a unix style shebang to the text."""
@@ -76,7 +274,9 @@ class Text:
         :param text: the text to put into a docstring
         :param indentation: the amount of spaces to indent the docstring with.
         """
-        if "." not in text:
+        if self.black_compatible:
+            docstring = self._black_docstring(text)
+        elif "." not in text:
             docstring = f'"""{text}."""'
         else:
             first_line, remaining_lines = text.split(".", 1)
@@ -89,21 +289,74 @@ class Text:
 
         self.add(docstring, indent, newlines)
 
+    def _black_docstring(self, text: str) -> str:
+        """Returns the text as a docstring normalised the way black would.
+
+        Surrounding whitespace is removed, as is the common indentation of all but the first
+        line and the whitespace at the end of every line.
+        """
+        closing_quotes = '"""'
+        if "." not in text:
+            text = f"{text.strip()}."
+        else:
+            first_line, remaining_lines = text.split(".", 1)
+            text = f"{first_line.rstrip('.')}."
+
+            if remaining_lines.strip():
+                text = f"{text}\n\n{remaining_lines.strip()}"
+                closing_quotes = '\n"""'
+
+        lines = text.splitlines()
+        remaining_lines = [line.expandtabs() for line in lines[1:]]
+        common_indent = min(
+            [
+                len(line) - len(line.lstrip())
+                for line in remaining_lines
+                if line.strip()
+            ],
+            default=0,
+        )
+
+        lines = [lines[0].strip()]
+        lines.extend(line[common_indent:].rstrip() for line in remaining_lines)
+        text = "\n".join(lines)
+        if text.startswith('"'):
+            text = f" {text}"
+
+        return f'"""{text}{closing_quotes}'
+
     def add_newline(self, count=1):
         """Adds a newline to the text.
 
         :param count: The amount of newlines to add
         """
-        self._text += count * "\n"
+        if count > 0:
+            self._chunks.append(count * "\n")
+
+    def flush(self) -> str:
+        """Returns and removes the text composed so far, except for any trailing newlines.
+
+        The trailing newlines are kept as the next addition might strip them. Joining all
+        flushed pieces with the final string gives the same result as never flushing.
+        """
+        text = self.string
+        content = text.rstrip("\n")
+        self._chunks = [text[len(content) :]] if len(content) < len(text) else []
+
+        return content
 
     @classmethod
     def from_string(cls, text: str):
         """Create class instance from text."""
         instance = cls()
-        instance._text = text
+        if text:
+            instance._chunks.append(text)
         return instance
 
     @property
     def string(self) -> str:
         """String representation of Text."""
-        return self._text
+        if len(self._chunks) > 1:
+            self._chunks[:] = ["".join(self._chunks)]
+
+        return self._chunks[0] if self._chunks else ""
@@ -0,0 +1,174 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, NamedTuple, Optional, Sequence, Tuple
+from .components.module import ModuleComponent
+
+
+class SyntaxProblem(NamedTuple):
+    """A syntax error in a rendered module, with the component that produced it.
+
+    :param path: The path of the module file, relative to the build folder
+    :param line: The line of the error in the module
+    :param message: The description of the error
+    :param component: The name of the class, method or function that produced the error,
+    like User.get for a method. None when the error is outside of those
+    :param component_type: The type of the component, like MethodComponent
+    :param component_line: The line of the error in the text of the component
+    """
+
+    path: str
+    line: int
+    message: str
+    component: Optional[str] = None
+    component_type: Optional[str] = None
+    component_line: Optional[int] = None
+
+    def __str__(self) -> str:
+        """Pretty representation of the problem."""
+        text = f"{self.path}:{self.line}: {self.message}"
+        if self.component:
+            text += (
+                f" (line {self.component_line} of {self.component_type} "
+                f"'{self.component}')"
+            )
+
+        return text
+
+
+class ModuleValidationError(Exception):
+    """Raised when rendered modules are not valid python."""
+
+    def __init__(self, problems: List[SyntaxProblem]):
+        """Initialise the error.
+
+        :param problems: The syntax errors of all broken modules
+        """
+        super().__init__(problems)
+        self.problems = problems
+
+    def __str__(self) -> str:
+        """Pretty representation of the error."""
+        lines = [f"{len(self.problems)} module(s) are not valid python:"]
+        lines.extend(f"  {problem}" for problem in self.problems)
+        return "\n".join(lines)
+
+
+def _syntax_error(text: str, filename: str) -> Optional[SyntaxError]:
+    """Returns the error of compiling the text, if it doesn't compile."""
+    try:
+        compile(text, filename, "exec", dont_inherit=True)
+    except SyntaxError as error:
+        return error
+
+    return None
+
+
+def _locate(
+    module: ModuleComponent, black_compatible: bool
+) -> Tuple[Optional[str], Optional[str], Optional[int]]:
+    """Returns the name, type and line of error of the component that doesn't compile.
+
+    Every class and function compiles on its own, so the broken one is found by compiling
+    them one at a time, and the methods of a broken class after that.
+    """
+    for class_ in module.classes:
+        if isinstance(class_, str):
+            continue
+
+        class_error = _syntax_error(class_.text(black_compatible), class_.name)
+        if class_error is None:
+            continue
+
+        for method in class_.methods:
+            if isinstance(method, str):
+                continue
+
+            method_error = _syntax_error(method.text(black_compatible), method.name)
+            if method_error is not None:
+                return (
+                    f"{class_.name}.{method.name}",
+                    method.__class__.__name__,
+                    method_error.lineno,
+                )
+
+        return class_.name, class_.__class__.__name__, class_error.lineno
+
+    for function in module.functions:
+        if isinstance(function, str):
+            continue
+
+        function_error = _syntax_error(function.text(black_compatible), function.name)
+        if function_error is not None:
+            return function.name, function.__class__.__name__, function_error.lineno
+
+    return None, None, None
+
+
+def validate_module(
+    module: ModuleComponent, path: str = "", black_compatible: bool = False
+) -> Optional[SyntaxProblem]:
+    """Compile the text of a module, returning its syntax error if it doesn't compile.
+
+    The module is compiled without formatting or writing it, which is much faster than
+    finding out through black. The error is traced back to the component producing it by
+    compiling the components of the module one at a time.
+
+    :param module: The module to validate
+    :param path: The path of the module file, used in the problem
+    :param black_compatible: Render the module the way black would format it
+    """
+    path = path or f"{module.name}.py"
+    try:
+        error = _syntax_error(module.text(black_compatible), path)
+    except Exception as error:
+        return SyntaxProblem(path, 0, f"{error.__class__.__name__}: {error}")
+
+    if error is None:
+        return None
+
+    component, component_type, component_line = _locate(module, black_compatible)
+    return SyntaxProblem(
+        path,
+        error.lineno or 0,
+        error.msg,
+        component,
+        component_type,
+        component_line,
+    )
+
+
+def _validate(item: Tuple[ModuleComponent, str], black_compatible: bool):
+    """Validate a single module with its path, for the process pool."""
+    module, path = item
+    return validate_module(module, path, black_compatible)
+
+
+def validate_modules(
+    modules: Sequence[Tuple[ModuleComponent, str]],
+    jobs: Optional[int] = 1,
+    black_compatible: bool = False,
+) -> List[SyntaxProblem]:
+    """Compile the text of modules, returning the syntax errors of all broken modules.
+
+    With more than one job the modules are spread over a process pool. Validating renders
+    the modules, so bodies given as generators can't be rendered again afterwards.
+
+    :param modules: The modules to validate with the path of their file
+    :param jobs: The amount of worker processes to use. None uses all available CPUs
+    :param black_compatible: Render the modules the way black would format them
+    """
+    results: Iterator[Optional[SyntaxProblem]]
+    if jobs == 1 or len(modules) <= 1:
+        results = (_validate(item, black_compatible) for item in modules)
+        return [problem for problem in results if problem is not None]
+
+    # Compiling a module is quick, so hand them to the workers in batches
+    chunk_size = max(1, len(modules) // (4 * (jobs or os.cpu_count() or 1)))
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        results = executor.map(
+            _validate,
+            modules,
+            [black_compatible] * len(modules),
+            chunksize=chunk_size,
+        )
+        return [problem for problem in results if problem is not None]
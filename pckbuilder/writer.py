@@ -0,0 +1,168 @@
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional, Set
+
+WriteCallback = Callable[[float], None]
+
+_STOP = None
+
+
+class FileWriter:
+    """Writes the files of a build on a background thread, so writing overlaps with rendering.
+
+    Files are handed over through a bounded queue. Adding a file blocks while the queue is
+    full, which keeps the amount of rendered text held in memory bounded. The writer keeps
+    track of the folders it created, so only files in an unknown folder cost a mkdir and
+    existing files are simply overwritten without checking for them first.
+
+    The callbacks of written files are run by collect, on the thread calling it, with the
+    seconds it took to write the file.
+    """
+
+    # Whether the pyproject.toml, setup.cfg and README.md files are part of the output
+    project_files = True
+
+    def __init__(self, build_folder: Path, max_pending: int = 16):
+        """Initialise the writer and start its thread.
+
+        :param build_folder: The existing folder the files are written to
+        :param max_pending: The maximum amount of files waiting to be written
+        """
+        self.build_folder = build_folder
+        self.max_pending = max_pending
+        self._queue: queue.Queue = queue.Queue(max_pending)
+        self._written: queue.SimpleQueue = queue.SimpleQueue()
+        self._folders: Set[Path] = {build_folder}
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, name="pckbuilder-writer")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def __repr__(self) -> str:
+        """Pretty representation of class instance."""
+        return f"<{self.__class__.__name__} '{self._queue.qsize()} pending'>"
+
+    def __enter__(self) -> "FileWriter":
+        """Returns the writer, which is closed when leaving the with statement."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Wait for the pending files, without raising write errors over another error."""
+        if exc_type is None:
+            self.close()
+        else:
+            self._stop()
+            self._abort()
+
+    def create_folders(self, folders: Iterable[str]) -> List[str]:
+        """Create the given folders in one go, parents first.
+
+        Returns the folders that weren't known to the writer yet.
+
+        :param folders: The folders to create relative to the build folder, these may
+        already exist
+        """
+        created = []
+        for folder in sorted(set(folders), key=lambda folder: folder.count("/")):
+            location = Path(self.build_folder, folder)
+            if location in self._folders:
+                continue
+
+            location.mkdir(parents=location.parent not in self._folders, exist_ok=True)
+            self._folders.add(location)
+            created.append(folder)
+
+        return created
+
+    def write(
+        self, relative_path: str, content: str, callback: Optional[WriteCallback] = None
+    ):
+        """Queue the content to be written to the given file.
+
+        Blocks while the queue is full. An error of a previous write is raised here.
+
+        :param relative_path: The path of the file relative to the build folder
+        :param content: The text to write to the file
+        :param callback: Called by collect once the file is written
+        """
+        self._raise_error()
+        self._queue.put((relative_path, content, callback))
+
+    def collect(self):
+        """Run the callbacks of the files written so far."""
+        while True:
+            try:
+                callback, write_seconds = self._written.get_nowait()
+            except queue.Empty:
+                return
+
+            callback(write_seconds)
+
+    def close(self):
+        """Wait for all queued files to be written and run their callbacks.
+
+        An error raised while writing any of the files is raised here.
+        """
+        self._stop()
+        try:
+            self._raise_error()
+            self._finish()
+        except BaseException:
+            self._abort()
+            raise
+
+        self.collect()
+
+    def _write_file(self, relative_path: str, content: str):
+        """Write a single file, this runs on the thread of the writer."""
+        location = Path(self.build_folder, relative_path)
+        folder = location.parent
+        if folder not in self._folders:
+            folder.mkdir(parents=True, exist_ok=True)
+            self._folders.add(folder)
+
+        with open(location, "w") as f:
+            f.write(content)
+
+    def _finish(self):
+        """Complete the output once all files are written."""
+
+    def _abort(self):
+        """Clean up after the build failed."""
+
+    def _stop(self):
+        """Stop the thread once the queued files are written."""
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+
+    def _raise_error(self):
+        """Raise the error of a failed write, if any."""
+        if self._error is not None:
+            raise self._error
+
+    def _run(self):
+        """Write the queued files until the writer is stopped.
+
+        After a failed write the remaining files are discarded, so nobody blocks on a full
+        queue.
+        """
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+
+            if self._error is not None:
+                continue
+
+            relative_path, content, callback = item
+            try:
+                start = time.perf_counter()
+                self._write_file(relative_path, content)
+
+                if callback is not None:
+                    self._written.put((callback, time.perf_counter() - start))
+            except BaseException as error:
+                self._error = error
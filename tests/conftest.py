@@ -0,0 +1,27 @@
+import subprocess
+import sys
+import pytest
+from pckbuilder import build
+
+
+@pytest.fixture
+def build_and_run(tmp_path):
+    """Returns a function building a package and running python code importing it.
+
+    The code runs in a separate interpreter with the build folder as working directory,
+    so the generated modules are imported from scratch. Its output is returned.
+    """
+
+    def run(package, code, **options):
+        build_folder = tmp_path / "build"
+        build(package, build_folder, **options)
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=build_folder,
+            capture_output=True,
+            text=True,
+        )
+        assert result.returncode == 0, result.stderr
+        return result.stdout
+
+    return run
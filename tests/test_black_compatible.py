@@ -0,0 +1,80 @@
+import black
+import pytest
+from pckbuilder import (
+    ClassComponent,
+    FunctionComponent,
+    ModuleComponent,
+    TypeComponent,
+    VariableComponent,
+)
+
+LONG_NAME = "b" * 74
+NESTED_TYPE = TypeComponent("Dict[str, YYYYYYYYYY]", True)
+
+
+def black_text(module: ModuleComponent) -> str:
+    """Returns the module text the way black formats it."""
+    return black.format_str(module.text(), mode=black.Mode())
+
+
+def function_module(arguments, method=False) -> ModuleComponent:
+    """Returns a module with a single function, or method, taking the given arguments."""
+    function = FunctionComponent(
+        "f", "F.", "pass", arguments, return_type=TypeComponent("int")
+    )
+    if method:
+        return ModuleComponent(
+            "m", "M.", classes=[ClassComponent("C", "C.", methods=[function])]
+        )
+
+    return ModuleComponent("m", "M.", functions=[function])
+
+
+ARGUMENTS = {
+    # The argument fits on its line, but not with the trailing comma black adds
+    "trailing_comma": [
+        VariableComponent("a" * 63, "", TypeComponent("List"), ["xxx", "x"])
+    ],
+    "long_type_hint": [VariableComponent(LONG_NAME, "", NESTED_TYPE)],
+    "long_type_hint_with_value": [VariableComponent(LONG_NAME, "", NESTED_TYPE, 1)],
+    "long_type_hint_with_collection": [
+        VariableComponent(LONG_NAME, "", NESTED_TYPE, ["xxx", "xxx"]),
+        VariableComponent("c", "", TypeComponent("int"), 1),
+    ],
+    "long_name_with_collection": [
+        VariableComponent("b" * 90, "", NESTED_TYPE, ["xxx", "xxx"])
+    ],
+    "type_hint_longer_than_line": [
+        VariableComponent("b", "", TypeComponent("Z" * 95), ["xxx", "xxx"])
+    ],
+}
+
+
+@pytest.mark.parametrize("method", [False, True])
+@pytest.mark.parametrize("case", sorted(ARGUMENTS))
+def test_black_compatible_signatures(case, method):
+    module = function_module(ARGUMENTS[case], method)
+    text = module.text(black_compatible=True)
+
+    assert black.format_str(text, mode=black.Mode()) == text
+
+
+@pytest.mark.parametrize("width", range(60, 100))
+def test_black_compatible_argument_widths(width):
+    arguments = [
+        VariableComponent("b" * width, "", NESTED_TYPE, ["xxx", "xxx", "xxx"]),
+        VariableComponent("c" * width, "", TypeComponent("List"), ("a",)),
+        VariableComponent("d" * width, "", NESTED_TYPE, {"k": "vvvvv"}),
+        VariableComponent("e" * width, "", NESTED_TYPE),
+    ]
+    for count in range(1, len(arguments) + 1):
+        module = function_module(arguments[:count])
+        text = module.text(black_compatible=True)
+
+        assert black.format_str(text, mode=black.Mode()) == text
+
+
+def test_black_compatible_matches_black():
+    module = function_module(ARGUMENTS["long_type_hint_with_value"])
+
+    assert module.text(black_compatible=True) == black_text(module)
@@ -0,0 +1,77 @@
+import black
+from pckbuilder import (
+    ClassComponent,
+    ModuleComponent,
+    PackageComponent,
+    TypeComponent,
+    VariableComponent,
+    build,
+)
+
+
+def test_build_in_parallel_with_raw_string_classes(tmp_path):
+    modules = [
+        ModuleComponent(
+            "raw",
+            "Raw.",
+            classes=["class Raw:\n    pass"],
+        ),
+        ModuleComponent(
+            "models",
+            "Models.",
+            classes=[
+                ClassComponent(
+                    "User",
+                    "User.",
+                    [VariableComponent("name", "Name.", TypeComponent("str"))],
+                )
+            ],
+        ),
+    ]
+    package = PackageComponent("pkg", "Package.", "0.1.0", modules)
+    build(package, tmp_path / "build", jobs=2)
+
+    assert "class Raw:" in (tmp_path / "build" / "pkg" / "raw.py").read_text()
+    assert "class User:" in (tmp_path / "build" / "pkg" / "models.py").read_text()
+
+
+def test_black_compatible_build_imports(tmp_path, build_and_run):
+    models = ModuleComponent(
+        "models",
+        "Models.",
+        classes=[
+            ClassComponent(
+                "User",
+                "User.",
+                [
+                    VariableComponent("name", "Name.", TypeComponent("str")),
+                    VariableComponent(
+                        "group", "Group.", TypeComponent("Group", True), None
+                    ),
+                ],
+            ),
+            ClassComponent("Group", "Group."),
+        ],
+    )
+    package = PackageComponent(
+        "pkg",
+        "Package.",
+        "0.1.0",
+        [models],
+        imports=["from .models import Group, User"],
+        lazy_imports=True,
+    )
+    output = build_and_run(
+        package,
+        "import pkg\nprint(pkg.User.__name__, pkg.Group.__name__)",
+        black_compatible=True,
+        format_with_black=False,
+        verify_sample=1,
+        compute_imports=True,
+        compile_bytecode=True,
+    )
+
+    assert output == "User Group\n"
+    for location in (tmp_path / "build" / "pkg").glob("*.py"):
+        text = location.read_text()
+        assert black.format_str(text, mode=black.Mode()) == text
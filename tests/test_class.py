@@ -0,0 +1,55 @@
+import pytest
+from pckbuilder import (
+    ClassComponent,
+    ModuleComponent,
+    PackageComponent,
+    TypeComponent,
+    VariableComponent,
+)
+
+
+def arguments():
+    return [
+        VariableComponent("name", "Name.", TypeComponent("str")),
+        VariableComponent("size", "Size.", TypeComponent("int"), 1),
+        VariableComponent("label", "Label.", TypeComponent("str", True), "x"),
+    ]
+
+
+def test_dataclass_refuses_mutable_defaults():
+    tags = VariableComponent("tags", "Tags.", TypeComponent("List[str]"), ["a"])
+
+    with pytest.raises(ValueError, match="can't have a mutable default"):
+        ClassComponent("User", "User.", [tags], dataclass=True)
+
+
+def test_frozen_requires_dataclass():
+    with pytest.raises(ValueError):
+        ClassComponent("User", "User.", frozen=True)
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        {"slots": True},
+        {"dataclass": True},
+        {"dataclass": True, "frozen": True},
+        {"dataclass": True, "slots": True},
+    ],
+)
+def test_classes_import(build_and_run, options):
+    base = ClassComponent("Base", "Base.", arguments()[:1], **options)
+    user = ClassComponent("User", "User.", arguments()[1:], base_class=base, **options)
+    module = ModuleComponent(
+        "models", "Models.", ["from typing import Optional"], classes=[base, user]
+    )
+    package = PackageComponent("sdk", "The SDK.", "0.1.0", [module])
+
+    output = build_and_run(
+        package,
+        "from dataclasses import is_dataclass\n"
+        "from sdk.models import User\n"
+        "user = User('name') if is_dataclass(User) else User()\n"
+        "print(user.size, user.label)",
+    )
+    assert output == "1 x\n"
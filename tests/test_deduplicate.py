@@ -0,0 +1,85 @@
+from pckbuilder import (
+    ClassComponent,
+    FunctionComponent,
+    MethodComponent,
+    ModuleComponent,
+    PackageComponent,
+    TypeComponent,
+    deduplicate,
+)
+
+
+def get_method():
+    return MethodComponent(
+        "get", "Get.", "return Response()", return_type=TypeComponent("Response")
+    )
+
+
+def secret_method():
+    return MethodComponent("secret", "Secret.", "return self.__secret")
+
+
+def example_package():
+    """Returns a package with the same methods in several classes and modules."""
+    classes = [
+        ClassComponent("First", "First."),
+        ClassComponent("Response", "Response."),
+        ClassComponent("A", "A.", methods=[get_method(), secret_method()]),
+        ClassComponent(
+            "B",
+            "B.",
+            methods=[get_method(), secret_method()],
+            base_class_name="Exception",
+        ),
+    ]
+    functions = [FunctionComponent("version", "Version.", "return sys.version")]
+    modules = [
+        ModuleComponent("models", "Models.", ["import sys"], classes=classes),
+        ModuleComponent("tools", "Tools.", ["import sys"], functions=functions),
+        ModuleComponent(
+            "more_tools",
+            "More tools.",
+            ["import sys"],
+            functions=[FunctionComponent("version", "Version.", "return sys.version")],
+        ),
+    ]
+    return PackageComponent("sdk", "The SDK.", "0.1.0", modules)
+
+
+def test_deduplicate_methods_into_mixins():
+    package = example_package()
+
+    assert deduplicate(package) == 2
+    models = package.modules[0]
+    assert [class_.name for class_ in models.classes] == [
+        "First",
+        "Response",
+        "_GetMixin",
+        "A",
+        "B",
+    ]
+    mixin, a, b = models.classes[2:]
+    assert [method.name for method in mixin.methods] == ["get"]
+    assert a.base_class_name == "_GetMixin"
+    assert b.base_class_name == "_GetMixin, Exception"
+    assert [module.name for module in package.modules][-1] == "_shared"
+    # Name mangling binds private names to the class defining the method
+    assert [method.name for method in a.methods] == ["secret"]
+    assert [method.name for method in b.methods] == ["secret"]
+
+
+def test_deduplicated_package_imports(build_and_run):
+    package = example_package()
+    output = build_and_run(
+        package,
+        "from sdk.models import A, B, Response\n"
+        "from sdk.tools import version\n"
+        "from sdk.more_tools import version as more_version\n"
+        "assert isinstance(A().get(), Response)\n"
+        "assert isinstance(B().get(), Response)\n"
+        "assert issubclass(B, Exception)\n"
+        "print(version() == more_version())",
+        deduplicate_definitions=True,
+    )
+
+    assert output == "True\n"
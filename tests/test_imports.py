@@ -0,0 +1,157 @@
+from pckbuilder import (
+    ClassComponent,
+    FunctionComponent,
+    MethodComponent,
+    ModuleComponent,
+    PackageComponent,
+    TypeComponent,
+    VariableComponent,
+    resolve_imports,
+)
+from pckbuilder.imports import merge_imports, relative_module
+
+
+def models_class(name: str, other: str, base_class_name=None) -> ClassComponent:
+    """Returns a class referring to another class in its type hints and method bodies."""
+    return ClassComponent(
+        name,
+        f"{name}.",
+        [VariableComponent("other", "Other.", TypeComponent(other, True))],
+        [
+            MethodComponent(
+                "make",
+                "Make the other class.",
+                f"return {other}() if helper() else None",
+                return_type=TypeComponent(other),
+                is_class_method=True,
+            ),
+            MethodComponent(
+                "hint", "Only hinted.", "return LIMIT", return_type=TypeComponent("D")
+            ),
+        ],
+        base_class_name=base_class_name,
+    )
+
+
+def models_module() -> ModuleComponent:
+    """Returns a module whose classes refer to each other."""
+    return ModuleComponent(
+        "models",
+        "Models.",
+        classes=[
+            ClassComponent("Root", "Root."),
+            models_class("A", "B", "Root"),
+            models_class("B", "A", "Root"),
+            models_class("C", "A"),
+            ClassComponent("D", "D.", base_class_name="Root"),
+        ],
+        variables=[VariableComponent("LIMIT", "Limit.", TypeComponent("int"), 1)],
+        functions=[
+            FunctionComponent("helper", "Help.", "return LIMIT"),
+            FunctionComponent("make_c", "Make C.", "return C()"),
+        ],
+    )
+
+
+def test_relative_module():
+    assert relative_module("sdk.models", "sdk.types") == ".types"
+    assert relative_module("sdk.api.users", "sdk.models") == "..models"
+
+
+def test_merge_imports():
+    assert merge_imports(
+        ["from typing import List", "import os", "from typing import Dict, List"]
+    ) == ["import os", "from typing import Dict, List"]
+
+
+def test_resolve_imports_between_modules():
+    users = ModuleComponent(
+        "users",
+        "Users.",
+        classes=[
+            ClassComponent(
+                "User",
+                "User.",
+                [VariableComponent("group", "Group.", TypeComponent("Group", True))],
+                [
+                    MethodComponent(
+                        "admin",
+                        "Admin.",
+                        "return Admin()",
+                        return_type=TypeComponent("Admin"),
+                    )
+                ],
+            )
+        ],
+    )
+    groups = ModuleComponent(
+        "groups",
+        "Groups.",
+        classes=[ClassComponent("Group", "Group."), ClassComponent("Admin", "Admin.")],
+    )
+    package = PackageComponent("sdk", "The SDK.", "0.1.0", [users, groups])
+    resolve_imports(package)
+
+    assert users.imports == [
+        "from __future__ import annotations",
+        "from typing import Optional, TYPE_CHECKING",
+        "\nif TYPE_CHECKING:\n    from .groups import Group",
+    ]
+    assert users.functions == ["from .groups import Admin"]
+    assert groups.imports == []
+
+
+def test_computed_imports_import(build_and_run):
+    module = models_module()
+    package = PackageComponent("sdk", "The SDK.", "0.1.0", [module])
+    output = build_and_run(
+        package,
+        "from sdk.models import A, B, C, D, make_c\n"
+        "print(type(A.make()).__name__, type(C.make()).__name__, make_c().hint())",
+        compute_imports=True,
+    )
+
+    assert output == "B A 1\n"
+
+
+def test_sharded_modules_import(build_and_run):
+    module = models_module()
+    package = PackageComponent("sdk", "The SDK.", "0.1.0", [module])
+    output = build_and_run(
+        package,
+        "import sdk.models as models\n"
+        "print(type(models.A.make()).__name__, type(models.C.make()).__name__,"
+        " models.make_c().hint(), models.helper(), issubclass(models.D, models.Root))",
+        compute_imports=True,
+        max_module_classes=1,
+    )
+
+    assert output == "B A 1 1 True\n"
+
+
+def test_shard():
+    module = models_module()
+    modules = module.shard(max_classes=2)
+
+    assert [shard.name for shard in modules] == [
+        "models",
+        "_models_base",
+        "_models_0",
+        "_models_1",
+    ]
+    reexports, base, first, second = modules
+    assert reexports.imports == [
+        "from ._models_base import LIMIT, Root, helper, make_c",
+        "from ._models_0 import A, B",
+        "from ._models_1 import C, D",
+    ]
+    # The base class goes to the base shard, which the other shards import directly
+    assert [class_.name for class_ in base.classes] == ["Root"]
+    assert "from ._models_base import LIMIT, Root, helper" in first.imports
+    assert [class_.name for class_ in first.classes] == ["A", "B"]
+    assert [class_.name for class_ in second.classes] == ["C", "D"]
+    # Classes used by bodies are imported after the definitions
+    assert base.functions[-1] == "from ._models_1 import C"
+    assert second.functions == ["from ._models_0 import A"]
+    # Classes only used in type hints are imported for type checkers
+    assert "\nif TYPE_CHECKING:\n    from ._models_1 import D" in first.imports
@@ -0,0 +1,59 @@
+import json
+from pckbuilder import PackageComponent
+from pckbuilder.loaders.json_schema import JsonSchemaLoader, python_name
+
+SCHEMA = {
+    "title": "Order",
+    "properties": {
+        "id": {"type": "integer"},
+        "from": {"$ref": "#/definitions/Address"},
+        "lines": {"type": "array"},
+    },
+    "required": ["id"],
+    "definitions": {
+        "Address": {
+            "properties": {
+                "class": {"type": "string"},
+                "match": {"type": ["string", "null"]},
+                "zip-code": {"type": "string"},
+            }
+        }
+    },
+}
+
+
+def test_python_name():
+    assert python_name("zip-code") == "zip_code"
+    assert python_name("2fa") == "_2fa"
+    assert python_name("class") == "class_"
+    assert python_name("None") == "None_"
+    assert python_name("match") == "match"
+
+
+def test_loaded_module():
+    module = JsonSchemaLoader().module("orders", SCHEMA)
+
+    address, order = module.classes
+    assert [argument.name for argument in address.class_arguments] == [
+        "class_",
+        "match",
+        "zip_code",
+    ]
+    assert [argument.type.text() for argument in order.class_arguments] == [
+        "int",
+        "Optional[Address]",
+        "Optional[List]",
+    ]
+    assert module.imports[0] == "from __future__ import annotations"
+
+
+def test_loaded_modules_import(tmp_path, build_and_run):
+    location = tmp_path / "schemas.json"
+    location.write_text(json.dumps({"orders": SCHEMA}))
+    modules = JsonSchemaLoader().iter_file(location)
+    package = PackageComponent("sdk", "The SDK.", "0.1.0", modules)
+
+    output = build_and_run(
+        package, "from sdk.orders import Address, Order\nprint(Order.__name__)"
+    )
+    assert output == "Order\n"
@@ -0,0 +1,25 @@
+import black
+import pytest
+from pckbuilder import PackageComponent
+
+
+@pytest.mark.parametrize("future_import", [False, True])
+@pytest.mark.parametrize("black_compatible", [False, True])
+def test_lazy_imports(black_compatible, future_import):
+    imports = ["import os", "from .models import User"]
+    if future_import:
+        imports.insert(1, "from __future__ import annotations")
+    package = PackageComponent(
+        "pkg", "Package.", "0.1.0", imports=imports, lazy_imports=True
+    )
+    text = package.init_text(black_compatible)
+    compile(text, "__init__.py", "exec")
+
+    lines = text.splitlines()
+    assert '    "User": (".models", "User"),' in lines
+    if future_import:
+        assert lines.index("from __future__ import annotations") < lines.index(
+            "import importlib"
+        )
+    if black_compatible:
+        assert black.format_str(text, mode=black.Mode()) == text
@@ -0,0 +1,93 @@
+from pckbuilder import (
+    ClassComponent,
+    FunctionComponent,
+    ModuleComponent,
+    RenderCache,
+    TypeComponent,
+    VariableComponent,
+)
+
+
+def example_module():
+    """Returns a module with a method shared by two classes."""
+    method = FunctionComponent(
+        "get", "Get.", "return 1", return_type=TypeComponent("int")
+    )
+    classes = [
+        ClassComponent("A", "A.", methods=[method]),
+        ClassComponent("B", "B.", methods=[method]),
+    ]
+    return ModuleComponent("models", "Models.", classes=classes), method
+
+
+def test_render_cache_reuses_unchanged_text():
+    module, _ = example_module()
+    cache = RenderCache()
+    with cache:
+        first = module.classes[0].text()
+    with cache:
+        second = module.classes[0].text()
+
+    assert second is first
+
+
+def test_render_cache_invalidates_changed_fields():
+    module, method = example_module()
+    cache = RenderCache()
+    with cache:
+        before = module.text()
+
+    method.body = "return 2"
+    with cache:
+        after = module.text()
+
+    assert after == module.text()
+    assert after.count("return 2") == 2
+    assert "return 1" not in after
+    assert before != after
+
+
+def test_render_cache_invalidates_changed_lists():
+    module, _ = example_module()
+    cache = RenderCache()
+    with cache:
+        module.text()
+
+    module.classes[1].class_arguments.append(
+        VariableComponent("name", "Name.", TypeComponent("str"))
+    )
+    module.classes[0].methods.append(FunctionComponent("put", "Put.", "pass"))
+    with cache:
+        text = module.text()
+
+    assert text == module.text()
+    assert "def put(" in text
+    assert "name: str" in text
+
+
+def test_render_cache_never_caches_callable_bodies():
+    lines = iter(["return 1"])
+    function = FunctionComponent("get", "Get.", lambda: list(lines) or ["return 2"])
+    module = ModuleComponent("models", "Models.", functions=[function])
+    cache = RenderCache()
+    with cache:
+        first = module.text()
+    with cache:
+        second = module.text()
+
+    assert "return 1" in first
+    assert "return 2" in second
+
+
+def test_render_cache_clear():
+    module, _ = example_module()
+    cache = RenderCache()
+    with cache:
+        first = module.text()
+
+    cache.clear()
+    with cache:
+        second = module.text()
+
+    assert second == first
+    assert second is not first
@@ -0,0 +1,117 @@
+import pytest
+from pckbuilder import (
+    ClassComponent,
+    FunctionComponent,
+    MethodComponent,
+    ModuleComponent,
+    PackageComponent,
+    Snapshot,
+    TypeComponent,
+    VariableComponent,
+    load_snapshot,
+    save_snapshot,
+)
+
+
+def example_package() -> PackageComponent:
+    """Returns a package using every kind of component, with a subpackage."""
+    base = ClassComponent(
+        "Base",
+        "Base.",
+        [VariableComponent("name", "The name.", TypeComponent("str"), "base")],
+        slots=True,
+    )
+    user = ClassComponent(
+        "User",
+        "User.",
+        [
+            VariableComponent("tags", "Tags.", TypeComponent("List[str]", True)),
+            VariableComponent("limits", "Limits.", TypeComponent("dict"), {"a": (1,)}),
+        ],
+        [
+            MethodComponent(
+                "create",
+                "Create a user.",
+                ["user = cls()", "return user"],
+                return_type=TypeComponent("User"),
+                is_class_method=True,
+            )
+        ],
+        base_class=base,
+    )
+    models = ModuleComponent(
+        "models",
+        "Models.",
+        imports=["from typing import List, Optional"],
+        variables=[VariableComponent("LIMIT", "Limit.", TypeComponent("int"), 10)],
+        classes=[base, user, "class Raw:\n    pass"],
+        functions=[
+            FunctionComponent(
+                "helper",
+                "Help.",
+                "return LIMIT",
+                [VariableComponent("value", "Value.", None, 1.5)],
+            ),
+        ],
+        executable_body="print(helper())",
+    )
+    tools = ModuleComponent(
+        "tools", "Tools.", functions=[FunctionComponent("tool", "Tool.", "pass")]
+    )
+    return PackageComponent(
+        "sdk",
+        "The SDK.",
+        "1.2.3",
+        [models],
+        keywords=["sdk"],
+        imports=["from .models import User"],
+        subpackages=[PackageComponent("extra", "Extra.", "1.2.3", [tools])],
+        lazy_imports=True,
+    )
+
+
+def test_snapshot_round_trip(tmp_path):
+    package = example_package()
+    location = tmp_path / "sdk.snapshot"
+    save_snapshot(package, location)
+
+    loaded = load_snapshot(location)
+    assert loaded.name == package.name
+    assert loaded.version == package.version
+    assert loaded.keywords == package.keywords
+    assert loaded.lazy_imports is True
+    assert loaded.init_text() == package.init_text()
+    assert [module.text() for module in loaded.modules] == [
+        module.text() for module in package.modules
+    ]
+
+    (subpackage,) = loaded.subpackages
+    assert subpackage.name == "extra"
+    assert subpackage.modules[0].text() == package.subpackages[0].modules[0].text()
+
+    user = loaded.modules[0].classes[1]
+    assert user.base_class is loaded.modules[0].classes[0]
+    assert user.class_arguments[1].value == {"a": (1,)}
+
+
+def test_snapshot_loads_single_modules(tmp_path):
+    package = example_package()
+    location = tmp_path / "sdk.snapshot"
+    save_snapshot(package, location)
+
+    snapshot = Snapshot(location)
+    assert snapshot.module_paths == ["sdk.models", "sdk.extra.tools"]
+    module = snapshot.module("sdk.extra.tools")
+    assert module.text() == package.subpackages[0].modules[0].text()
+    assert snapshot.module("sdk.extra.tools") is module
+
+    with pytest.raises(KeyError):
+        snapshot.module("sdk.missing")
+
+
+def test_snapshot_refuses_other_files(tmp_path):
+    location = tmp_path / "package.json"
+    location.write_text('{"package": {}}' + " " * 64)
+
+    with pytest.raises(ValueError, match="is not a snapshot"):
+        Snapshot(location)
@@ -0,0 +1,110 @@
+import json
+import pytest
+from pckbuilder import FormatCache, load_spec, parse_spec, save_snapshot
+from pckbuilder.cli import main
+
+SPEC = {
+    "package": {
+        "name": "sdk",
+        "description": "The SDK.",
+        "version": "0.1.0",
+        "modules": [
+            {
+                "name": "models",
+                "description": "Models.",
+                "imports": ["from typing import Optional"],
+                "classes": [
+                    {"name": "Base", "arguments": [{"name": "id", "type": "int"}]},
+                    {
+                        "name": "User",
+                        "base_class": "Base",
+                        "arguments": [
+                            {
+                                "name": "email",
+                                "type": {"name": "str", "optional": True},
+                            }
+                        ],
+                        "methods": [
+                            {
+                                "name": "create",
+                                "body": "return cls()",
+                                "class_method": True,
+                            }
+                        ],
+                    },
+                ],
+                "functions": [{"name": "helper", "body": "return 1"}],
+            }
+        ],
+    },
+    "build": {"build_folder": "out", "jobs": None, "format_cache": False},
+}
+
+
+def test_parse_spec(tmp_path):
+    spec = parse_spec(SPEC, tmp_path)
+
+    assert spec.options == {"build_folder": tmp_path / "out", "jobs": None}
+    (module,) = list(spec.package.modules)
+    base, user = module.classes
+    assert user.base_class is base
+    assert user.class_arguments[0].type.text() == "Optional[str]"
+    assert user.methods[0].is_class_method
+    assert module.functions[0].name == "helper"
+
+
+def test_parse_spec_format_cache(tmp_path):
+    spec = parse_spec({**SPEC, "build": {"format_cache": "cache"}}, tmp_path)
+
+    assert isinstance(spec.options["format_cache"], FormatCache)
+
+
+@pytest.mark.parametrize(
+    "data, message",
+    [
+        ({"package": {"name": "sdk"}}, "Missing field"),
+        ({"package": {**SPEC["package"], "extra": 1}}, "Unknown field"),
+        ({**SPEC, "build": {"jobs": "2"}}, "Invalid value"),
+        ({**SPEC, "build": {"verify_sample": True}}, "Invalid value"),
+        ({**SPEC, "build": {"threads": 2}}, "Unknown build option"),
+    ],
+)
+def test_parse_spec_errors(tmp_path, data, message):
+    with pytest.raises(ValueError, match=message):
+        list(parse_spec(data, tmp_path).package.modules)
+
+
+def test_parse_spec_unknown_base_class(tmp_path):
+    module = {"name": "models", "classes": [{"name": "User", "base_class": "Base"}]}
+    package = {**SPEC["package"], "modules": [module]}
+
+    with pytest.raises(ValueError, match="isn't defined earlier"):
+        list(parse_spec({"package": package}, tmp_path).package.modules)
+
+
+def test_load_spec_snapshot(tmp_path):
+    location = tmp_path / "sdk.snapshot"
+    save_snapshot(parse_spec(SPEC, tmp_path).package, location)
+
+    spec = load_spec(location)
+    assert spec.options == {}
+    assert [class_.name for class_ in spec.package.modules[0].classes] == [
+        "Base",
+        "User",
+    ]
+
+
+def test_cli_builds_spec(tmp_path):
+    location = tmp_path / "spec.json"
+    location.write_text(json.dumps(SPEC))
+
+    assert main([str(location), "--quiet"]) == 0
+    assert (tmp_path / "out" / "sdk" / "models.py").exists()
+
+
+def test_cli_reports_invalid_spec(tmp_path, capsys):
+    location = tmp_path / "spec.json"
+    location.write_text("{")
+
+    assert main([str(location)]) == 2
+    assert "is not a valid spec" in capsys.readouterr().err